@@ -0,0 +1,110 @@
+import itertools
+from contextlib import asynccontextmanager
+
+import httpx
+
+from benchmarks.fixtures import JOB_DESCRIPTION, latex_resume
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+HISTORY_ENTRIES = 50
+
+def use_in_memory_mongo():
+    """Points db at mongomock-motor so the ASGI benchmarks need no running MongoDB."""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+        import mongomock.collection
+    except ImportError:
+        raise SystemExit("ASGI benchmarks need mongomock-motor: pip install -r benchmarks/requirements.txt")
+
+    import db
+    from config import MONGO_DB_NAME
+
+    # pymongo 4.9+ passes sort= to bulk updates, which mongomock does not accept yet
+    addUpdate = mongomock.collection.BulkOperationBuilder.add_update
+    if not getattr(addUpdate, "accepts_sort", False):
+        def add_update(self, *args, sort=None, **kwargs):
+            return addUpdate(self, *args, **kwargs)
+        add_update.accepts_sort = True
+        mongomock.collection.BulkOperationBuilder.add_update = add_update
+
+    db.client = AsyncMongoMockClient()
+    db.db = db.client[MONGO_DB_NAME]
+
+async def seed_history(email: str):
+    from datetime import datetime, timedelta
+    from utils.resumeStore import insert_resume_entries
+
+    now = datetime.utcnow()
+    await insert_resume_entries([
+        {
+            "user_email": email,
+            "resume_text": latex_resume(2),
+            "job_description": f"{JOB_DESCRIPTION} Posting {index}.",
+            "score": 60 + index % 40,
+            "feedback": "Strong backend match.",
+            "tailored_resume": latex_resume(2),
+            "created_at": now - timedelta(minutes=index)
+        }
+        for index in range(HISTORY_ENTRIES)
+    ])
+
+@asynccontextmanager
+async def asgi_session():
+    """Runs the app lifespan against in-memory Mongo and the fake LLM, yielding (client, auth headers)."""
+    use_in_memory_mongo()
+    from main import app, lifespan
+    from db import get_user_collection
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/auth/signup", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            userCollection = await get_user_collection()
+            await userCollection.update_one({"email": BENCH_EMAIL}, {"$set": {"credits": 10 ** 9}})
+            login = await client.post("/auth/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            await seed_history(BENCH_EMAIL)
+            yield client, {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+def asgi_benchmarks(client, headers) -> dict:
+    """Returns {name: zero-argument coroutine function}; each call is one request that must succeed."""
+    resumeText = latex_resume(2)[:2900]
+    counter = itertools.count()
+
+    async def expect_ok(response):
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.request.url.path} returned {response.status_code}: {response.text[:200]}")
+        # Most routes report failures as 200 with success=false; /auth/login and /auth/me carry no flag
+        if response.json().get("success", True) is not True:
+            raise RuntimeError(f"{response.request.url.path} failed: {response.text[:200]}")
+
+    async def login():
+        await expect_ok(await client.post("/auth/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD}))
+
+    async def me():
+        await expect_ok(await client.get("/auth/me", headers=headers))
+
+    async def history_summary():
+        await expect_ok(await client.get("/resume/history", params={"limit": 20}, headers=headers))
+
+    async def history_full():
+        await expect_ok(await client.get("/resume/history", params={"limit": 20, "view": "full"}, headers=headers))
+
+    async def analyze_uncached():
+        # A unique trailing comment per call keeps every request a cache miss; run.py turns off
+        # incremental re-analysis, which would otherwise serve it as unchanged without the LLM
+        body = {"resume_text": f"{resumeText}\n% {next(counter)}", "job_description": JOB_DESCRIPTION}
+        await expect_ok(await client.post("/resume/analyze", json=body, headers=headers))
+
+    async def analyze_cached():
+        body = {"resume_text": resumeText, "job_description": JOB_DESCRIPTION}
+        await expect_ok(await client.post("/resume/analyze", json=body, headers=headers))
+
+    return {
+        "POST /auth/login": login,
+        "GET /auth/me": me,
+        "GET /resume/history?view=summary": history_summary,
+        "GET /resume/history?view=full": history_full,
+        "POST /resume/analyze (miss)": analyze_uncached,
+        "POST /resume/analyze (cached)": analyze_cached
+    }
@@ -0,0 +1,69 @@
+import json
+
+from anthropic.types import Message
+
+RESUME_SIZES_KB = [1, 2, 4, 8]
+
+PREAMBLE = r"""\documentclass[letterpaper,11pt]{article}
+\usepackage[empty]{fullpage}
+\usepackage{titlesec}
+\usepackage[hidelinks]{hyperref}
+\usepackage{enumitem}
+% Section headings with a rule underneath
+\titleformat{\section}{\scshape\raggedright\large}{}{0em}{}[\titlerule]
+\begin{document}
+\begin{center}
+{\Large \textbf{Jordan Example}} \\ Software Engineer \\ \href{mailto:jordan@example.com}{jordan@example.com}
+\end{center}
+"""
+
+SECTION = r"""
+\section{Experience %d}
+\textbf{Software Engineer} \hfill 2021 -- 2024
+\begin{itemize}[leftmargin=*]
+  \item Designed FastAPI services handling 50k daily requests with p95 latency under 200ms.
+  \item Modelled MongoDB collections and compound indexes, cutting query latency by 60\%%.
+  \item Containerised services with Docker and automated deploys through GitHub Actions.
+  \item Integrated LLM APIs with streaming, retries and result caching to control spend.
+\end{itemize}
+"""
+
+JOB_DESCRIPTION = (
+    "We are hiring a Software Engineer to build Python web services with FastAPI and MongoDB. "
+    "Requirements: 1+ years of Python, REST API design, async programming, Docker and CI/CD. "
+    "Nice to have: React, LLM integrations and observability tooling. "
+) * 4
+
+def latex_resume(size_kb: int) -> str:
+    """Realistic LaTeX resume padded with experience sections to roughly size_kb kilobytes."""
+    target = size_kb * 1024
+    parts = [PREAMBLE]
+    index = 1
+    while sum(len(part) for part in parts) < target:
+        parts.append(SECTION % index)
+        index += 1
+    # A few control characters so clean_input_text has something to strip
+    return "\x00" + "".join(parts)[:target - len(r"\end{document}") - 2] + "\n\\end{document}\x07"
+
+def analysis_payload(size_kb: int) -> dict:
+    return {
+        "success": True,
+        "score": 84,
+        "feedback": "Strong backend match; quantify impact and surface Docker/CI experience earlier.",
+        "tailored_resume": latex_resume(size_kb).strip("\x00\x07")
+    }
+
+def fenced_reply(size_kb: int) -> str:
+    return "Here is the analysis:\n```json\n" + json.dumps(analysis_payload(size_kb)) + "\n```"
+
+def tool_message(size_kb: int) -> Message:
+    return Message.model_validate({
+        "id": "msg_bench",
+        "type": "message",
+        "role": "assistant",
+        "model": "bench",
+        "content": [{"type": "tool_use", "id": "toolu_bench", "name": "submit_resume_analysis", "input": analysis_payload(size_kb)}],
+        "stop_reason": "tool_use",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1000, "output_tokens": 500}
+    })
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from benchmarks.fixtures import (
+    RESUME_SIZES_KB,
+    JOB_DESCRIPTION,
+    latex_resume,
+    analysis_payload,
+    fenced_reply,
+    tool_message,
+)
+from models import ResumeEntry, User
+from utils.latexCompactor import compact_resume
+from utils.prescore import prescore
+from utils.resumeHelper import (
+    clean_input_text,
+    validate_text_limits,
+    is_free_usage,
+    extract_json_text,
+    extract_analysis_input,
+    validate_analysis,
+)
+
+def validate_or_reject(resume_text: str, job_description: str):
+    # Larger inputs exceed the paid limits; the rejection path is part of the hot path too
+    try:
+        validate_text_limits(resume_text, job_description, True)
+    except HTTPException:
+        pass
+
+def check_prescore_scale():
+    # A fast prescore on the wrong scale is no win: the posting against itself must score ~100
+    selfScore = prescore(JOB_DESCRIPTION, JOB_DESCRIPTION)["score"]
+    if selfScore < 99:
+        raise RuntimeError(f"prescore of identical text is {selfScore}, expected about 100")
+
+def micro_benchmarks() -> dict:
+    """Returns {name: zero-argument callable}."""
+    check_prescore_scale()
+    benches = {}
+    for sizeKb in RESUME_SIZES_KB:
+        raw = latex_resume(sizeKb)
+        cleaned = clean_input_text(raw)
+        payload = analysis_payload(sizeKb)
+        reply = fenced_reply(sizeKb)
+        message = tool_message(sizeKb)
+
+        benches[f"clean_input_text[{sizeKb}kb]"] = lambda raw=raw: clean_input_text(raw)
+        benches[f"compact_resume[{sizeKb}kb]"] = lambda text=cleaned: compact_resume(text)
+        # Throughput: ops_per_sec in the report is scores per second on one core
+        benches[f"prescore[{sizeKb}kb]"] = lambda text=compact_resume(cleaned)["text"]: prescore(text, JOB_DESCRIPTION)
+        benches[f"validate_text_limits[{sizeKb}kb]"] = lambda text=cleaned: validate_or_reject(text, JOB_DESCRIPTION)
+        benches[f"is_free_usage[{sizeKb}kb]"] = lambda text=cleaned: is_free_usage(text, JOB_DESCRIPTION)
+        benches[f"extract_json_text[{sizeKb}kb]"] = lambda reply=reply: extract_json_text(reply)
+        benches[f"extract_analysis_input[{sizeKb}kb]"] = lambda message=message: extract_analysis_input(message)
+        benches[f"validate_analysis[{sizeKb}kb]"] = lambda payload=payload: validate_analysis(payload)
+
+    entry = {
+        "user_email": "bench@example.com",
+        "resume_text": latex_resume(2),
+        "job_description": JOB_DESCRIPTION,
+        "score": 84,
+        "feedback": "Strong backend match.",
+        "tailored_resume": latex_resume(2),
+        "created_at": datetime.utcnow()
+    }
+    user = {"email": "bench@example.com", "password": "$2b$12$" + "x" * 53, "created_at": datetime.utcnow(), "credits": 5}
+    benches["ResumeEntry(...).dict()"] = lambda: ResumeEntry(**entry).dict()
+    benches["User(...)"] = lambda: User(**user)
+    return benches
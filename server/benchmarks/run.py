@@ -0,0 +1,170 @@
+"""Benchmarks for the request hot path, with JSON baselines for spotting regressions.
+
+Run from the server directory:
+    python -m benchmarks.run                          # run everything and print results
+    python -m benchmarks.run --save baseline          # write benchmarks/baselines/baseline.json
+    python -m benchmarks.run --compare baseline       # fail if any benchmark is slower than the baseline
+    python -m benchmarks.run --suite micro --filter 8kb
+
+The ASGI suite runs the real app in-process against mongomock-motor and the fake LLM provider
+(pip install -r benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+def summarize(name: str, suite: str, seconds: list) -> dict:
+    ordered = sorted(seconds)
+    median = statistics.median(ordered)
+    return {
+        "suite": suite,
+        "samples": len(ordered),
+        "median_us": round(1e6 * median, 3),
+        "min_us": round(1e6 * ordered[0], 3),
+        "p95_us": round(1e6 * ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1)))], 3),
+        "ops_per_sec": round(1 / median, 1) if median else None
+    }
+
+def run_micro(benches: dict, repeat: int, min_time: float) -> dict:
+    results = {}
+    for name, fn in benches.items():
+        timer = timeit.Timer(fn)
+        number, elapsed = timer.autorange()
+        # Scale loops so each repeat runs for at least min_time
+        number = max(number, int(number * min_time / elapsed)) if elapsed else number
+        perOp = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+        results[name] = summarize(name, "micro", perOp)
+        print(f"  {name:<45} {results[name]['median_us']:>12.2f} us", file=sys.stderr)
+    return results
+
+async def run_asgi(iterations: int, warmup: int, name_filter: str) -> dict:
+    from benchmarks.asgi import asgi_session, asgi_benchmarks
+
+    results = {}
+    async with asgi_session() as (client, headers):
+        for name, call in asgi_benchmarks(client, headers).items():
+            if name_filter and name_filter not in name:
+                continue
+            try:
+                for _ in range(warmup):
+                    await call()
+                seconds = []
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    await call()
+                    seconds.append(time.perf_counter() - start)
+            except Exception as e:
+                results[name] = {"suite": "asgi", "error": str(e)}
+                print(f"  {name:<45} error: {e}", file=sys.stderr)
+                continue
+            results[name] = summarize(name, "asgi", seconds)
+            print(f"  {name:<45} {results[name]['median_us'] / 1000:>12.2f} ms", file=sys.stderr)
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def baseline_path(name: str) -> str:
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Prints a comparison table and returns the names that regressed beyond threshold."""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if not previous or "median_us" not in previous or "median_us" not in current:
+            print(f"{name:<45} {'-':>12} {current.get('median_us', '-'):>12} {'new':>9}")
+            continue
+        change = current["median_us"] / previous["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<45} {previous['median_us']:>12.2f} {current['median_us']:>12.2f} {100 * change:>+8.1f}%{flag}")
+    return regressions
+
+def main(args) -> int:
+    results = {}
+    if args.suite in ("micro", "all"):
+        from benchmarks.micro import micro_benchmarks
+
+        print("micro benchmarks (per op):", file=sys.stderr)
+        benches = {name: fn for name, fn in micro_benchmarks().items() if not args.filter or args.filter in name}
+        results.update(run_micro(benches, args.repeat, args.min_time))
+    if args.suite in ("asgi", "all"):
+        print("ASGI benchmarks (per request):", file=sys.stderr)
+        results.update(asyncio.run(run_asgi(args.iterations, args.warmup, args.filter)))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bcrypt_rounds": int(os.environ.get("BCRYPT_ROUNDS", "12"))
+        },
+        "results": results
+    }
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.save), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"saved {baseline_path(args.save)}", file=sys.stderr)
+
+    if args.compare:
+        with open(baseline_path(args.compare), encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed more than {100 * args.threshold:.0f}%", file=sys.stderr)
+            return 1
+    elif not args.save:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", choices=["micro", "asgi", "all"], default="all")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=7, help="micro: timing repeats")
+    parser.add_argument("--min-time", type=float, default=0.1, help="micro: minimum seconds per repeat")
+    parser.add_argument("--iterations", type=int, default=50, help="asgi: timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="asgi: untimed requests per endpoint")
+    parser.add_argument("--save", metavar="NAME", help="write results as a baseline (name or path)")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a saved baseline (name or path)")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before failing, e.g. 0.15 = 15%%")
+    args = parser.parse_args()
+
+    # Must be set before the app's config module is imported
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    os.environ.setdefault("LLM_FAKE_LATENCY", "fixed:0")
+    os.environ.setdefault("LLM_FAKE_ERROR_RATE", "0")
+    os.environ.setdefault("MONGO_DB_NAME", "resumegenie_bench")
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret")
+    # One user hammers the same endpoints; per-user rate limits would turn every run into 429s
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # The cache-miss benchmark resubmits with a new comment, which incremental re-analysis would
+    # serve from the previous entry without an LLM call
+    os.environ.setdefault("INCREMENTAL_ANALYSIS_ENABLED", "false")
+
+    sys.exit(main(args))
@@ -1,13 +1,134 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 MONGODB_URI = os.getenv("MONGODB_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "resumegenie")
 OPENAI_API = os.getenv("OPENAI_API")
 CLAUDE_API = os.getenv("CLAUDE_API")
 SECRET_KEY = os.getenv("SECRET_KEY")
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+
+# LLM client pool
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "10"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Analysis result cache
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+ANALYSIS_CACHE_MONGO_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_MONGO_TTL_SECONDS", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_CHARGE_ON_HIT = os.getenv("ANALYSIS_CACHE_CHARGE_ON_HIT", "false").lower() == "true"
+
+# Analysis job queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_SWEEP_INTERVAL_SECONDS = int(os.getenv("JOB_SWEEP_INTERVAL_SECONDS", "60"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 3600)))
+
+# Batch analysis
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "10"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# Resume history pagination
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "100"))
+
+# MongoDB connection pool
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Authenticated principal cache (per process; shown balances are read fresh, see principalCache)
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "2048"))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
+# Resume history blob storage
+BLOB_CACHE_SIZE = int(os.getenv("BLOB_CACHE_SIZE", "256"))
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "6"))
+
+# LLM resilience
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+LLM_LATENCY_BUDGET_SECONDS = float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "90"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "5"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# LLM provider: "anthropic" for the real API, "fake" to replay recorded responses (load tests, local runs)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "anthropic").lower()
+LLM_FAKE_RESPONSES_PATH = os.getenv(
+    "LLM_FAKE_RESPONSES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest", "recorded_responses.json")
+)
+LLM_FAKE_LATENCY = os.getenv("LLM_FAKE_LATENCY", "lognormal:1500:0.4")
+LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "42"))
+
+# Prometheus metrics at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Credit reservations (held while an analysis runs; the sweeper refunds expired ones).
+# Reservations live for the worst-case LLM time of what they cover plus this much slack
+CREDIT_RESERVATION_TTL_SECONDS = int(os.getenv("CREDIT_RESERVATION_TTL_SECONDS", "300"))
+CREDIT_SWEEP_INTERVAL_SECONDS = int(os.getenv("CREDIT_SWEEP_INTERVAL_SECONDS", "60"))
+
+# Admission control in front of analyses (per-tier rates live in FREE_TIER_LIMITS / PAID_TIER_LIMITS)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "32"))
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+
+# LaTeX -> PDF rendering
+PDFLATEX_PATH = os.getenv("PDFLATEX_PATH", "pdflatex")
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "resumegenie-pdf-cache"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PDF_COMPILE_WORKERS = int(os.getenv("PDF_COMPILE_WORKERS", "2"))
+PDF_COMPILE_TIMEOUT_SECONDS = float(os.getenv("PDF_COMPILE_TIMEOUT_SECONDS", "30"))
+PDF_COMPILE_MEMORY_MB = int(os.getenv("PDF_COMPILE_MEMORY_MB", "768"))
+
+# Resume file uploads (PDF / DOCX)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(512 * 1024)))
+UPLOAD_MAX_PAGES = int(os.getenv("UPLOAD_MAX_PAGES", "10"))
+UPLOAD_EXTRACT_WORKERS = int(os.getenv("UPLOAD_EXTRACT_WORKERS", "2"))
+UPLOAD_TEXT_CACHE_SIZE = int(os.getenv("UPLOAD_TEXT_CACHE_SIZE", "512"))
+UPLOAD_TEXT_CACHE_TTL_SECONDS = int(os.getenv("UPLOAD_TEXT_CACHE_TTL_SECONDS", "86400"))
+
+# Local keyword pre-score (no LLM call)
+PRESCORE_MAX_CHARS = int(os.getenv("PRESCORE_MAX_CHARS", "50000"))
+
+# Shared job-description requirement extraction (one LLM extraction per posting, reused across users)
+JD_REQUIREMENTS_ENABLED = os.getenv("JD_REQUIREMENTS_ENABLED", "true").lower() == "true"
+# Short postings are already compact; extracting them would not shrink the prompt
+JD_REQUIREMENTS_MIN_CHARS = int(os.getenv("JD_REQUIREMENTS_MIN_CHARS", "800"))
+JD_REQUIREMENTS_CACHE_SIZE = int(os.getenv("JD_REQUIREMENTS_CACHE_SIZE", "1024"))
+JD_REQUIREMENTS_CACHE_TTL_SECONDS = int(os.getenv("JD_REQUIREMENTS_CACHE_TTL_SECONDS", "21600"))
+JD_REQUIREMENTS_FAILURE_TTL_SECONDS = int(os.getenv("JD_REQUIREMENTS_FAILURE_TTL_SECONDS", "300"))
+JD_REQUIREMENTS_MONGO_TTL_SECONDS = int(os.getenv("JD_REQUIREMENTS_MONGO_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Incremental re-analysis of edited resumes against a JD the user already analyzed
+INCREMENTAL_ANALYSIS_ENABLED = os.getenv("INCREMENTAL_ANALYSIS_ENABLED", "true").lower() == "true"
+# Above this share of changed content a full analysis is cheaper than patching
+INCREMENTAL_MAX_CHANGED_RATIO = float(os.getenv("INCREMENTAL_MAX_CHANGED_RATIO", "0.4"))
@@ -1,21 +1,132 @@
 import motor.motor_asyncio
-from config import MONGODB_URI
+from pymongo.errors import OperationFailure
+
+from config import (
+    MONGODB_URI,
+    MONGO_DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    ANALYSIS_CACHE_MONGO_TTL_SECONDS,
+    JD_REQUIREMENTS_MONGO_TTL_SECONDS,
+)
+from utils.metrics import MongoCommandMetrics
 
 client = None
 db = None
 
-async def get_database():
+def create_client():
     global client, db
 
     if client is None:
-        client = motor.motor_asyncio.AsyncIOMotorClient(MONGODB_URI)
-        db = client["resumegenie"]
+        client = motor.motor_asyncio.AsyncIOMotorClient(
+            MONGODB_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            retryWrites=True,
+            appname="resumegenie",
+            event_listeners=[MongoCommandMetrics()]
+        )
+        db = client[MONGO_DB_NAME]
+    return db
+
+async def connect_to_mongo():
+    create_client()
+    # Warm-up ping so a bad URI or unreachable cluster fails startup, not the first request
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        raise RuntimeError(f"MongoDB is unreachable: {e}") from e
     return db
 
+async def close_mongo_connection():
+    global client, db
+
+    if client is not None:
+        client.close()
+        client = None
+        db = None
+
+async def get_database():
+    # Lazy fallback for scripts that run without the app lifespan
+    return db if db is not None else create_client()
+
 async def get_resume_collection():
     db = await get_database()
     return db["resume"]
 
 async def get_user_collection():
     db = await get_database()
-    return db["user"]
\ No newline at end of file
+    return db["user"]
+
+async def get_blob_collection():
+    db = await get_database()
+    return db["resume_blob"]
+
+async def get_analysis_cache_collection():
+    db = await get_database()
+    return db["analysis_cache"]
+
+async def get_job_collection():
+    db = await get_database()
+    return db["analysis_job"]
+
+async def get_rate_limit_collection():
+    db = await get_database()
+    return db["rate_limit"]
+
+async def get_jd_requirements_collection():
+    db = await get_database()
+    return db["jd_requirements"]
+
+async def ensure_ttl_index(collection, field: str, expire_after_seconds: int):
+    try:
+        await collection.create_index(field, expireAfterSeconds=expire_after_seconds)
+    except OperationFailure as e:
+        # IndexOptionsConflict: the TTL changed in config, so update it in place
+        if e.code != 85:
+            raise
+        await collection.database.command(
+            "collMod",
+            collection.name,
+            index={"keyPattern": {field: 1}, "expireAfterSeconds": expire_after_seconds}
+        )
+
+async def ensure_indexes():
+    # create_index is a no-op when an identical index exists, so this is safe on every boot
+    userCollection = await get_user_collection()
+    await userCollection.create_index("email", unique=True, name="email_unique")
+    # Lets the reservation sweeper find expired holds without scanning every user
+    await userCollection.create_index("credit_reservations.expires_at", sparse=True, name="credit_reservations_expires_at")
+
+    resumeCollection = await get_resume_collection()
+    # Serves the keyset-paginated history query and its (created_at, _id) sort
+    await resumeCollection.create_index(
+        [("user_email", 1), ("created_at", -1), ("_id", -1)],
+        name="user_email_created_at"
+    )
+    # Finds the user's latest analysis of the same job description for incremental re-analysis
+    await resumeCollection.create_index(
+        [("user_email", 1), ("job_description_ref", 1), ("created_at", -1)],
+        name="user_email_job_description_ref"
+    )
+
+    cacheCollection = await get_analysis_cache_collection()
+    await ensure_ttl_index(cacheCollection, "created_at", ANALYSIS_CACHE_MONGO_TTL_SECONDS)
+
+    jobCollection = await get_job_collection()
+    await ensure_ttl_index(jobCollection, "expires_at", 0)
+    await jobCollection.create_index([("status", 1), ("created_at", 1)])
+
+    rateLimitCollection = await get_rate_limit_collection()
+    await ensure_ttl_index(rateLimitCollection, "expires_at", 0)
+
+    requirementsCollection = await get_jd_requirements_collection()
+    await ensure_ttl_index(requirementsCollection, "created_at", JD_REQUIREMENTS_MONGO_TTL_SECONDS)
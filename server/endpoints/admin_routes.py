@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends
+
+from utils.dependencies import require_admin
+from utils.llmClient import get_llm_stats
+from utils.analysisCache import get_analysis_cache_stats
+from utils.analysisHelper import get_single_flight_stats
+from utils.jdRequirements import get_jd_requirements_stats
+from utils.jobQueue import get_job_queue_stats
+from utils.password import get_password_pool_stats
+from utils.principalCache import get_principal_cache_stats
+from utils.resumeStore import get_storage_report
+from utils.resumeHelper import get_structured_output_stats
+from utils.llmResilience import get_resilience_stats
+from utils.rateLimiter import get_admission_stats
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/llm")
+async def get_llm_pool_stats():
+    return {
+        "success": True,
+        "data": {
+            **get_llm_stats(),
+            "structured_output": get_structured_output_stats(),
+            "resilience": get_resilience_stats()
+        }
+    }
+
+@router.get("/analysis-cache")
+async def get_cache_stats():
+    return {
+        "success": True,
+        "data": {
+            **get_analysis_cache_stats(),
+            "single_flight": get_single_flight_stats(),
+            "jd_requirements": get_jd_requirements_stats()
+        }
+    }
+
+@router.get("/jobs")
+async def get_job_stats():
+    return {
+        "success": True,
+        "data": get_job_queue_stats()
+    }
+
+@router.get("/password-pool")
+async def get_password_stats():
+    return {
+        "success": True,
+        "data": get_password_pool_stats()
+    }
+
+@router.get("/principal-cache")
+async def get_principal_stats():
+    return {
+        "success": True,
+        "data": get_principal_cache_stats()
+    }
+
+@router.get("/storage")
+async def get_resume_storage_report():
+    return {
+        "success": True,
+        "data": await get_storage_report()
+    }
+
+@router.get("/admission")
+async def get_admission_control_stats():
+    return {
+        "success": True,
+        "data": get_admission_stats()
+    }
@@ -4,8 +4,10 @@ from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from models import UserCreate, Token, User
 from db import get_user_collection
 from utils.auth import addNewUser, checkUser
+from utils.creditHelper import get_remaining_credits
 from utils.dependencies import get_current_user
 from utils.password import hash_password
+from utils.principalCache import invalidate_principal
 
 
 router = APIRouter(prefix="/auth", tags = ["AUTH"])
@@ -15,7 +17,7 @@ router = APIRouter(prefix="/auth", tags = ["AUTH"])
 async def get_me(user: User = Depends(get_current_user)):
     return {
         "email": user.email,
-        "credits": user.credits
+        "credits": await get_remaining_credits(user.email)
     }
 
 # User Signup
@@ -69,7 +71,7 @@ async def get_current_user_data(current_user: dict = Depends(get_current_user)):
     return {
         "success": True,
         "email": current_user.email,
-        "credits": current_user.credits,
+        "credits": await get_remaining_credits(current_user.email),
         "created_at": current_user.created_at
     }
 
@@ -95,6 +97,7 @@ async def update_user(updates: UserCreate, current_user: User = Depends(get_curr
             {"email": current_user.email},
             {"$set": updateData}
         )
+        invalidate_principal(current_user.email)
 
         if result.modified_count == 0:
             raise Exception("update failed or nothing changed")
@@ -7,6 +7,7 @@ from utils.dependencies import get_current_user
 from models import CheckoutRequest
 from config import STRIPE_WEBHOOK_SECRET
 from db import get_user_collection
+from utils.principalCache import invalidate_principal
 
 router = APIRouter(prefix="/credits", tags=["Credits"])
 
@@ -85,4 +86,5 @@ async def stripe_webhook(request: Request):
         await userCollection.update_one(
             {"email": email},
             {"$inc": {"credits": credits}}
-        )
\ No newline at end of file
+        )
+        invalidate_principal(email)
\ No newline at end of file
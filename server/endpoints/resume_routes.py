@@ -1,115 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from datetime import datetime
 from bson import ObjectId
 
-from models import ResumeRequest, User, ResumeEntry
-from db import get_user_collection, get_resume_collection
+from models import ResumeRequest, BatchResumeRequest, User
+from db import get_resume_collection
 from utils.dependencies import get_current_user
-from utils.resumeHelper import score_resume_with_claude, clean_input_text, is_free_usage, validate_text_limits, FREE_TIER_LIMITS, PAID_TIER_LIMITS
+from utils.resumeHelper import stream_resume_with_claude, clean_input_text, is_free_usage, validate_raw_resume_size, FREE_TIER_LIMITS, PAID_TIER_LIMITS
+from utils.streamParser import STREAMED_FIELDS, format_sse_event
+from utils.resumeStore import insert_resume_entries, hydrate_entry, hydrate_entries
+from utils.historyHelper import HISTORY_SUMMARY_PROJECTION, summarize_history_entry, encode_history_cursor, decode_history_cursor
+from utils.analysisHelper import prepare_analysis, prompt_resume, prompt_job_description, run_analysis, save_and_settle, build_analysis_data, build_resume_entry, spawn_background
+from utils.creditHelper import deduct_credit, refund_credit, get_remaining_credits, reserve_credits, commit_reservation, release_reservation
+from utils.analysisCache import get_cached_analysis, store_analysis
+from utils.incrementalAnalysis import run_incremental_analysis, reused_previous_analysis
+from utils.llmResilience import ensure_llm_available
+from utils.latexCompactor import compact_resume, restore_preamble, PreambleRestorer
+from utils.prescore import prescore
+from utils.uploadHelper import receive_upload, extract_upload_text
+from utils.pdfRenderer import render_pdf, open_cached_pdf, iter_pdf, PdfRenderError, PdfRendererUnavailable
+from utils.rateLimiter import admit_analysis, release_analysis, enforce_rate_limit
+from utils.jobQueue import ensure_queue_capacity, create_job, enqueue_job, discard_job, get_job
+from config import ANALYSIS_CACHE_CHARGE_ON_HIT, BATCH_MAX_JOBS, BATCH_CONCURRENCY, HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE, PRESCORE_MAX_CHARS
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
 
-# POST request to analyze the resume
-@router.post("/analyze")
-async def analyzeResume(
-    resume_request: ResumeRequest, 
-    current_user: Optional[User] = Depends(get_current_user)
-):
+async def analyze_admitted(resume_request: ResumeRequest, current_user: Optional[User]):
+    """Body of /analyze for a caller already holding an admission slot; /upload shares it."""
     try:
-        resumeText = clean_input_text(resume_request.resume_text)
-        jobDescription = clean_input_text(resume_request.job_description)
+        analysis = prepare_analysis(resume_request, current_user)
+        resumeText = analysis["resume_text"]
+        jobDescription = analysis["job_description"]
+        needsCredit = analysis["needs_credit"]
 
-        if not resumeText or not jobDescription:
-            raise HTTPException(status_code = 400, detail = "Resume and Job Description cannot be empty")
+        cacheKey = analysis["cache_key"]
+        cachedResponse = await get_cached_analysis(cacheKey)
+        chargeCredit = needsCredit and (cachedResponse is None or ANALYSIS_CACHE_CHARGE_ON_HIT)
 
-        needsCredit = not is_free_usage(resumeText, jobDescription)
-        is_paid_user = current_user is not None
+        if cachedResponse is None:
+            ensure_llm_available()
+        reservation = None
+        if chargeCredit:
+            # Held until the analysis settles; the sweeper refunds it if this request dies first
+            reservation = await reserve_credits(current_user.email)
 
-        validate_text_limits(resumeText, jobDescription, is_paid_user)
-        if needsCredit:
-            if not current_user:
-                raise HTTPException(
-                    status_code=401, 
-                    detail={
-                        "message": "Login required for content exceeding free tier limits",
-                        "limits": FREE_TIER_LIMITS,
-                        "current": {
-                            "resume_chars": len(resumeText),
-                            "jd_chars": len(jobDescription),
-                            "total_chars": len(resumeText) + len(jobDescription)
-                        }
-                    }
-                )
-
-            if current_user.credits<1:
-                raise HTTPException(
-                    status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                    detail={
-                        "message": "Insufficient credits. Please purchase more to continue.",
-                        "current_credits": current_user.credits,
-                        "required_credits": 1
-                    }
-                )
-            userCollection = await get_user_collection()
-            result = await userCollection.update_one(
-                {"email": current_user.email, "credits": {"$gte":1}},
-                {"$inc": {"credits": -1}}
-            )
-            if result.modified_count == 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail = "Credit deduction failed. Please try again"
-                )
+        if cachedResponse is not None:
+            response = cachedResponse
+        else:
+            # An edit of a resume already analyzed for this job only re-analyzes the edited sections
+            response = await run_incremental_analysis(analysis, current_user and current_user.email) or await run_analysis(analysis)
 
-        response = await score_resume_with_claude(resumeText, jobDescription)
+        if reservation and not ANALYSIS_CACHE_CHARGE_ON_HIT and reused_previous_analysis(response):
+            # No model call was made, so it is billed like a cache hit
+            await release_reservation(current_user.email, reservation)
+            reservation = None
+            chargeCredit = False
 
         if not response.get("success"):
-            if needsCredit and current_user:
-                userCollection = await get_user_collection()
-                await userCollection.update_one(
-                    {"email": current_user.email},
-                    {"$inc": {"credits": 1}}
-                )
+            if reservation:
+                await release_reservation(current_user.email, reservation)
             
             raise HTTPException(
                 status_code=400, 
                 detail=response.get("message", "Resume analysis failed")
             )
  
-        if current_user:
-            resumeEntry = ResumeEntry(
-                user_email=current_user.email,
-                resume_text=resumeText,
-                job_description=jobDescription,
-                score=response["score"],
-                feedback=response["feedback"],
-                tailored_resume=response["tailored_resume"],
-                created_at=datetime.utcnow(),
-            )
-            resumeCollection = await get_resume_collection()
-            await resumeCollection.insert_one(resumeEntry.dict())
-            saveMsg = "Resume saved to database"
-        else:
-            saveMsg = "Entry generated but not saved (user not logged in)"
-
-        updated_credits = None
-        if current_user:
-            userCollection = await get_user_collection()
-            updated_user = await userCollection.find_one({"email": current_user.email})
-            updated_credits = updated_user.get("credits", 0) if updated_user else 0
+        saveMsg, updated_credits = await save_and_settle(current_user, reservation, resumeText, jobDescription, response)
 
         return {
             "success": True,
             "message": saveMsg,
-            "data": {
-                "score": response["score"],
-                "feedback": response["feedback"],
-                "tailored_resume": response["tailored_resume"],
-                "remaining_credits": updated_credits,
-                "credits_used": 1 if needsCredit else 0,
-                "tier_used": "paid" if needsCredit else "free"
-            }
+            "data": build_analysis_data(
+                response,
+                updated_credits,
+                1 if chargeCredit else 0,
+                analysis["tier"],
+                cachedResponse is not None,
+                analysis["compacted_resume"]["stats"]
+            )
         }
 
     except HTTPException:
@@ -120,32 +92,407 @@ async def analyzeResume(
             "success": False,
             "message": str(e)
         }
+
+# POST request to analyze the resume
+@router.post("/analyze")
+async def analyzeResume(
+    request: Request,
+    resume_request: ResumeRequest, 
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    # Shed load with 429 before any credit is reserved or the LLM is called
+    await admit_analysis(request, current_user)
+    try:
+        return await analyze_admitted(resume_request, current_user)
+    finally:
+        release_analysis()
+
+# POST request to analyze the resume, streaming fields back as Server-Sent Events
+@router.post("/analyze/stream")
+async def analyzeResumeStream(
+    request: Request,
+    resume_request: ResumeRequest,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    await admit_analysis(request, current_user)
+    try:
+        analysis = prepare_analysis(resume_request, current_user)
+        resumeText = analysis["resume_text"]
+        jobDescription = analysis["job_description"]
+        needsCredit = analysis["needs_credit"]
+
+        cacheKey = analysis["cache_key"]
+        cachedResponse = await get_cached_analysis(cacheKey)
+        chargeCredit = needsCredit and (cachedResponse is None or ANALYSIS_CACHE_CHARGE_ON_HIT)
+
+        # Credit and availability errors surface as normal HTTP errors before the stream opens
+        if cachedResponse is None:
+            ensure_llm_available()
+        reservation = await reserve_credits(current_user.email) if chargeCredit else None
+    except BaseException:
+        release_analysis()
+        raise
+
+    events = asyncio.Queue()
+
+    # Runs detached from the connection so a client disconnect still persists and settles credits
+    async def runAnalysis():
+        nonlocal reservation, chargeCredit
+        settled = False
+        try:
+            response = cachedResponse
+            if response is None:
+                response = await run_incremental_analysis(analysis, current_user and current_user.email)
+            if response is not None and reservation and not ANALYSIS_CACHE_CHARGE_ON_HIT and reused_previous_analysis(response):
+                # No model call was made, so it is billed like a cache hit
+                await release_reservation(current_user.email, reservation)
+                reservation = None
+                chargeCredit = False
+            if response is not None:
+                for field in STREAMED_FIELDS:
+                    await events.put((field, {"value" if field == "score" else "delta": response.get(field)}))
+            else:
+                response = None
+                compacted = prompt_resume(analysis)
+                restorer = PreambleRestorer(compacted["preamble"])
+                promptJob = await prompt_job_description(analysis)
+                async for event, data in stream_resume_with_claude(compacted["text"], promptJob, tier=analysis["tier"]):
+                    if event == "result":
+                        response = data
+                    elif event == "tailored_resume":
+                        delta = restorer.feed(data["delta"])
+                        if delta:
+                            await events.put((event, {"delta": delta}))
+                    else:
+                        await events.put((event, data))
+                tail = restorer.finish()
+                if tail:
+                    await events.put(("tailored_resume", {"delta": tail}))
+                if response.get("success"):
+                    response["tailored_resume"] = restore_preamble(response.get("tailored_resume"), compacted["preamble"])
+                await store_analysis(cacheKey, response)
+
+            if not response.get("success"):
+                if reservation:
+                    await release_reservation(current_user.email, reservation)
+                settled = True
+                await events.put(("error", {"message": response.get("message", "Resume analysis failed")}))
+                return
+
+            saveMsg, updated_credits = await save_and_settle(current_user, reservation, resumeText, jobDescription, response)
+            settled = True
+            await events.put(("done", {
+                "success": True,
+                "message": saveMsg,
+                "data": build_analysis_data(
+                    response,
+                    updated_credits,
+                    1 if chargeCredit else 0,
+                    analysis["tier"],
+                    cachedResponse is not None,
+                    analysis["compacted_resume"]["stats"]
+                )
+            }))
+        except Exception as e:
+            if reservation and not settled:
+                await release_reservation(current_user.email, reservation)
+            await events.put(("error", {"message": str(e)}))
+        finally:
+            release_analysis()
+            await events.put(None)
+
+    spawn_background(runAnalysis())
+
+    async def eventStream():
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            yield format_sse_event(*item)
+
+    return StreamingResponse(
+        eventStream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
     
+# POST request to analyze one resume against several job descriptions
+@router.post("/analyze/batch")
+async def analyzeResumeBatch(
+    request: Request,
+    batch_request: BatchResumeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    jobDescriptions = batch_request.job_descriptions
+    if not jobDescriptions:
+        raise HTTPException(status_code=400, detail="At least one job description is required")
+    if len(jobDescriptions) > BATCH_MAX_JOBS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many job descriptions: {len(jobDescriptions)}/{BATCH_MAX_JOBS}"
+        )
+
+    await admit_analysis(request, current_user, len(jobDescriptions))
+    try:
+        analyses = []
+        for index, jobDescription in enumerate(jobDescriptions):
+            try:
+                analyses.append(prepare_analysis(
+                    ResumeRequest(resume_text=batch_request.resume_text, job_description=jobDescription),
+                    current_user
+                ))
+            except HTTPException as e:
+                raise HTTPException(status_code=e.status_code, detail={"index": index, "error": e.detail})
+
+        cachedResponses = await asyncio.gather(*[get_cached_analysis(a["cache_key"]) for a in analyses])
+        chargeFlags = [
+            a["needs_credit"] and (cached is None or ANALYSIS_CACHE_CHARGE_ON_HIT)
+            for a, cached in zip(analyses, cachedResponses)
+        ]
+        creditsReserved = sum(chargeFlags)
+        if any(cached is None for cached in cachedResponses):
+            ensure_llm_available()
+
+        # Reserve credits for the whole batch in one atomic update, held for as many waves as the semaphore runs
+        waves = -(-sum(cached is None for cached in cachedResponses) // BATCH_CONCURRENCY)
+        reservation = await reserve_credits(current_user.email, creditsReserved, max(waves, 1)) if creditsReserved else None
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def analyzeOne(analysis, cached):
+            if cached is not None:
+                return cached
+            async with semaphore:
+                return await run_analysis(analysis)
+
+        try:
+            responses = await asyncio.gather(*[
+                analyzeOne(a, cached) for a, cached in zip(analyses, cachedResponses)
+            ], return_exceptions=True)
+        except asyncio.CancelledError:
+            if reservation:
+                await release_reservation(current_user.email, reservation)
+            raise
+
+        results = []
+        entries = []
+        creditsRefunded = 0
+        for index, (analysis, cached, charged, response) in enumerate(zip(analyses, cachedResponses, chargeFlags, responses)):
+            if isinstance(response, Exception):
+                response = {"success": False, "message": str(response)}
+
+            if not response.get("success"):
+                creditsRefunded += 1 if charged else 0
+                results.append({
+                    "index": index,
+                    "success": False,
+                    "message": response.get("message", "Resume analysis failed")
+                })
+                continue
+
+            entries.append(build_resume_entry(current_user.email, analysis["resume_text"], analysis["job_description"], response))
+            results.append({
+                "index": index,
+                "success": True,
+                "score": response["score"],
+                "feedback": response["feedback"],
+                "tailored_resume": response["tailored_resume"],
+                "credits_used": 1 if charged else 0,
+                "tier_used": analysis["tier"],
+                "cached": cached is not None
+            })
+
+        # Settle the reservation (refunding failed analyses) while the entries are written
+        pending = []
+        if reservation:
+            pending.append(commit_reservation(current_user.email, reservation, creditsRefunded))
+        if entries:
+            pending.append(insert_resume_entries(entries))
+        settled = await asyncio.gather(*pending)
+
+        if reservation and settled[0]:
+            remainingCredits = reservation["balance"] + creditsRefunded
+        else:
+            remainingCredits = await get_remaining_credits(current_user.email)
+
+        # Highest score first, failures last in their original order
+        results.sort(key=lambda item: (not item["success"], -item.get("score", 0), item["index"]))
+
+        return {
+            "success": True,
+            "message": f"{len(entries)} of {len(analyses)} analyses completed",
+            "data": {
+                "results": results,
+                "completed": len(entries),
+                "failed": len(analyses) - len(entries),
+                "credits_used": creditsReserved - creditsRefunded,
+                "remaining_credits": remainingCredits,
+                "compaction": analyses[0]["compacted_resume"]["stats"]
+            }
+        }
+    finally:
+        release_analysis()
+
+# POST a PDF/DOCX resume (multipart field "file"); with a "job_description" field it is analyzed right away
+@router.post("/upload")
+async def uploadResume(
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    # Admitted before a byte of the body is read: buffering and parsing the file is the costly
+    # part, so extraction alone draws from the same bucket and gate as an analysis
+    await admit_analysis(request, current_user)
+    try:
+        upload = await receive_upload(request)
+        try:
+            resumeText, fileType, cached = await extract_upload_text(upload)
+        finally:
+            upload.close()
+
+        uploadInfo = {
+            "filename": upload.filename,
+            "file_type": fileType,
+            "file_hash": upload.digest.hexdigest(),
+            "size_bytes": upload.size,
+            "text_cached": cached
+        }
+        jobDescription = upload.fields.get("job_description", b"").decode("utf-8", errors="replace")
+        if not jobDescription.strip():
+            return {
+                "success": True,
+                "message": "Resume text extracted",
+                "data": {"resume_text": clean_input_text(resumeText), **uploadInfo}
+            }
+
+        result = await analyze_admitted(
+            ResumeRequest(resume_text=resumeText, job_description=jobDescription),
+            current_user
+        )
+        if result.get("data"):
+            result["data"]["upload"] = uploadInfo
+        return result
+    finally:
+        release_analysis()
+
+# POST request to queue an analysis job; poll GET /resume/jobs/{job_id} for the result
+@router.post("/jobs", status_code=202)
+async def submitAnalysisJob(
+    request: Request,
+    resume_request: ResumeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    # Queued work is bounded by the queue itself, so only the per-user rate applies here
+    await enforce_rate_limit(request, current_user)
+    analysis = prepare_analysis(resume_request, current_user)
+    ensure_queue_capacity()
+
+    cachedResponse = await get_cached_analysis(analysis["cache_key"])
+    chargeCredit = analysis["needs_credit"] and (cachedResponse is None or ANALYSIS_CACHE_CHARGE_ON_HIT)
+
+    if cachedResponse is None:
+        ensure_llm_available()
+    if chargeCredit:
+        await deduct_credit(current_user)
+
+    try:
+        jobId = await create_job(current_user.email, analysis, chargeCredit, cachedResponse)
+    except Exception:
+        if chargeCredit:
+            await refund_credit(current_user.email)
+        raise HTTPException(status_code=500, detail="Could not create analysis job")
+
+    if cachedResponse is None and not enqueue_job(jobId):
+        await discard_job(jobId)
+        if chargeCredit:
+            await refund_credit(current_user.email)
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis queue is full. Please retry shortly.",
+            headers={"Retry-After": "10"}
+        )
+
+    return {
+        "success": True,
+        "message": "Analysis job queued",
+        "data": {
+            "job_id": jobId,
+            "status": "completed" if cachedResponse is not None else "queued"
+        }
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str, current_user: User = Depends(get_current_user)):
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = await get_job(job_id, current_user.email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "success": True,
+        "data": {
+            "job_id": str(job["_id"]),
+            "status": job["status"],
+            "result": job.get("result"),
+            "error": job.get("error"),
+            "created_at": job["created_at"].isoformat(),
+            "finished_at": job["finished_at"].isoformat() if job.get("finished_at") else None
+        }
+    }
+
 @router.get("/history")
-async def get_resume_history(current_user: Optional[User] = Depends(get_current_user)):
+async def get_resume_history(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("summary", pattern="^(summary|full)$"),
+    current_user: Optional[User] = Depends(get_current_user)
+):
     try:
         if not current_user:
             raise HTTPException(
                 status_code=401,
                 detail="Login required"
             )
+
+        query = {"user_email": current_user.email}
+        if cursor:
+            createdAt, lastId = decode_history_cursor(cursor)
+            # Keyset on (created_at, _id) so pages stay stable while new entries arrive
+            query["$or"] = [
+                {"created_at": {"$lt": createdAt}},
+                {"created_at": createdAt, "_id": {"$lt": lastId}}
+            ]
+
+        projection = HISTORY_SUMMARY_PROJECTION if view == "summary" else None
         resumeCollection = await get_resume_collection()
-        historyCursor = resumeCollection.find({
-            "user_email": current_user.email
-        }).sort("created_at", -1)
+        historyCursor = resumeCollection.find(query, projection).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(limit + 1)
 
-        history = []
+        history = await historyCursor.to_list(length=limit + 1)
+        hasMore = len(history) > limit
+        history = history[:limit]
+        if view == "full":
+            await hydrate_entries(history)
+        else:
+            for item in history:
+                summarize_history_entry(item)
+        nextCursor = encode_history_cursor(history[-1]) if hasMore else None
 
-        async for item in historyCursor:
+        for item in history:
             item["_id"] = str(item["_id"])
-            history.append(item)
 
         return {
             "success": True,
             "count": len(history),
             "data": history,
-            "message": "All resumes retrieved"
+            "next_cursor": nextCursor,
+            "has_more": hasMore,
+            "message": "Resumes retrieved"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "success": False,
@@ -168,6 +515,7 @@ async def get_resume_entry(id: str, current_user: User = Depends(get_current_use
                 detail="Resume Entry not found"
             )
         
+        await hydrate_entry(resume)
         resume["_id"] = str(resume["_id"])
         if isinstance(resume["created_at"], datetime):
             resume["created_at"] = resume["created_at"].isoformat()
@@ -184,6 +532,64 @@ async def get_resume_entry(id: str, current_user: User = Depends(get_current_use
             "message": str(e)
         }
     
+# GET the tailored resume of a history entry compiled to PDF
+@router.get("/{id}/pdf")
+async def get_resume_pdf(id: str, current_user: User = Depends(get_current_user)):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=404, detail="Resume Entry not found")
+
+    resumeCollection = await get_resume_collection()
+    resume = await resumeCollection.find_one(
+        {"_id": ObjectId(id), "user_email": current_user.email},
+        {"tailored_resume": 1, "tailored_resume_ref": 1}
+    )
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume Entry not found")
+
+    # Blob-backed entries already carry the content hash, so cache hits skip the blob read too
+    cacheKey = resume.get("tailored_resume_ref")
+    # Served from an open handle, so cache eviction cannot pull the file out from under the response
+    pdfFile = open_cached_pdf(cacheKey) if cacheKey else None
+    if pdfFile is None:
+        await hydrate_entry(resume)
+        if not resume.get("tailored_resume"):
+            raise HTTPException(status_code=404, detail="Entry has no tailored resume")
+        try:
+            pdfFile = await render_pdf(resume["tailored_resume"], cacheKey)
+        except PdfRendererUnavailable as e:
+            raise HTTPException(status_code=503, detail=f"PDF rendering is unavailable: {e}")
+        except PdfRenderError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    return StreamingResponse(
+        iter_pdf(pdfFile),
+        media_type="application/pdf",
+        headers={
+            "Content-Length": str(os.fstat(pdfFile.fileno()).st_size),
+            "Content-Disposition": f'attachment; filename="tailored_resume_{id}.pdf"',
+            "Cache-Control": "private, max-age=86400"
+        }
+    )
+
+# POST request for an instant keyword match score, computed locally without the LLM
+@router.post("/prescore")
+async def prescoreResume(resume_request: ResumeRequest):
+    resumeText = clean_input_text(resume_request.resume_text)
+    jobDescription = clean_input_text(resume_request.job_description)
+
+    if not resumeText or not jobDescription:
+        raise HTTPException(status_code=400, detail="Resume and Job Description cannot be empty")
+    if len(resumeText) > PRESCORE_MAX_CHARS or len(jobDescription) > PRESCORE_MAX_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Resume and Job Description must each be under {PRESCORE_MAX_CHARS} characters"
+        )
+
+    return {
+        "success": True,
+        "data": prescore(compact_resume(resumeText)["text"], jobDescription)
+    }
+
 @router.get("/limits")
 async def get_usage_limits(current_user: Optional[User] = Depends(get_current_user)):
     """Get character limits for current user"""
@@ -195,7 +601,7 @@ async def get_usage_limits(current_user: Optional[User] = Depends(get_current_us
         "data": {
             "limits": limits,
             "tier": "paid" if is_paid_user else "free",
-            "current_credits": current_user.credits if current_user else 0
+            "current_credits": await get_remaining_credits(current_user.email) if current_user else 0
         }
     }
 
@@ -208,6 +614,9 @@ async def check_content_limits(
     """Check if content fits within user's limits"""
     try:
         resume_text = clean_input_text(resume_text)
+        validate_raw_resume_size(resume_text)
+        compacted = compact_resume(resume_text)
+        resume_text = compacted["text"]
         job_description = clean_input_text(job_description)
         
         is_paid_user = current_user is not None
@@ -231,7 +640,9 @@ async def check_content_limits(
                     "total_chars": total_chars
                 },
                 "limits": limits,
-                "tier": "paid" if is_paid_user else "free"
+                "tier": "paid" if is_paid_user else "free",
+                "compaction": compacted["stats"],
+                "prescore": prescore(resume_text, job_description)
             }
         }
         
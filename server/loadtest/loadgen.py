@@ -0,0 +1,199 @@
+"""Open-loop load generator for POST /resume/analyze that also audits credit balances afterwards.
+
+Run from the server directory (defaults to the fake LLM provider and a separate database):
+    python -m loadtest.loadgen --rps 20 --duration 30 --users 10
+
+By default the app is driven in-process through its ASGI interface; pass --base-url to
+target a running server instead (it must use the same MONGO_DB_NAME so balances can be checked).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+
+JOB_DESCRIPTION = (
+    "We are hiring a Software Engineer to build and operate Python web services. "
+    "You will design REST APIs with FastAPI, model data in MongoDB, and ship features end to end "
+    "with a small product team. Requirements: 1+ years of professional experience with Python; "
+    "solid understanding of HTTP, REST and async programming; experience with a document or "
+    "relational database; familiarity with Docker and CI/CD pipelines; clear written communication. "
+    "Nice to have: React or another modern frontend framework, experience integrating LLM APIs, "
+    "observability tooling such as Prometheus, and cost-aware engineering of third-party API usage. "
+    "You will own services in production, participate in code review, write tests, and help improve "
+    "latency and reliability across the platform."
+)
+
+def percentile(ordered: list, fraction: float):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def load_resumes(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [response["tailored_resume"] for response in json.load(f)]
+
+async def setup_users(client, count: int, credits: int, password: str) -> list:
+    from db import get_user_collection
+
+    userCollection = await get_user_collection()
+    users = []
+    for index in range(count):
+        email = f"loadtest-{index}@example.com"
+        await client.post("/auth/signup", json={"email": email, "password": password})
+        # Set balances directly so every run starts from a known total
+        await userCollection.update_one({"email": email}, {"$set": {"credits": credits}})
+        login = await client.post("/auth/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        users.append({"email": email, "token": login.json()["access_token"], "credits_used": 0, "unknown": 0})
+    return users
+
+async def send_request(client, user: dict, body: dict, results: list):
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            "/resume/analyze",
+            json=body,
+            headers={"Authorization": f"Bearer {user['token']}"}
+        )
+        status = response.status_code
+        if status == 200:
+            user["credits_used"] += response.json()["data"]["credits_used"]
+    except Exception as e:
+        # The server may or may not have charged a request whose reply never arrived
+        status = type(e).__name__
+        user["unknown"] += 1
+    results.append((status, time.perf_counter() - start))
+
+async def run_load(client, users: list, resumes: list, args) -> dict:
+    rng = random.Random(args.seed)
+    results = []
+    tasks = []
+    start = time.perf_counter()
+    nextArrival = 0.0
+    sent = 0
+
+    # Open loop: arrivals follow the schedule regardless of how quickly responses come back
+    while nextArrival < args.duration:
+        delay = start + nextArrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        resumeText = rng.choice(resumes)
+        if rng.random() < args.unique_ratio:
+            # A trailing LaTeX comment makes the request miss the analysis cache (and, with incremental
+            # re-analysis off, run the full analysis)
+            resumeText = f"{resumeText}\n% loadtest request {sent}"
+        body = {"resume_text": resumeText, "job_description": JOB_DESCRIPTION}
+        tasks.append(asyncio.create_task(send_request(client, rng.choice(users), body, results)))
+        sent += 1
+        nextArrival += rng.expovariate(args.rps) if args.poisson else 1 / args.rps
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(str(status) for status, _ in results)
+    okLatencies = sorted(latency for status, latency in results if status == 200)
+    allLatencies = sorted(latency for _, latency in results)
+    return {
+        "sent": sent,
+        "elapsed_seconds": round(elapsed, 2),
+        "target_rps": args.rps,
+        "throughput_rps": round(len(results) / elapsed, 2),
+        "success_rps": round(statuses.get("200", 0) / elapsed, 2),
+        "status_counts": dict(statuses),
+        "latency_ms": {
+            scope: {
+                "p50": round(1000 * percentile(latencies, 0.50), 1) if latencies else None,
+                "p95": round(1000 * percentile(latencies, 0.95), 1) if latencies else None,
+                "p99": round(1000 * percentile(latencies, 0.99), 1) if latencies else None,
+                "max": round(1000 * latencies[-1], 1) if latencies else None
+            }
+            for scope, latencies in (("success", okLatencies), ("all", allLatencies))
+        }
+    }
+
+async def audit_credits(users: list, initial_credits: int) -> dict:
+    """Compares stored balances with what the server reported charging; any gap is a lost or double update."""
+    from db import get_user_collection
+
+    userCollection = await get_user_collection()
+    mismatches = []
+    for user in users:
+        stored = await userCollection.find_one({"email": user["email"]}, {"credits": 1})
+        expected = initial_credits - user["credits_used"]
+        if stored["credits"] != expected and not user["unknown"]:
+            mismatches.append({"email": user["email"], "expected": expected, "stored": stored["credits"]})
+        if stored["credits"] < 0:
+            mismatches.append({"email": user["email"], "expected": ">= 0", "stored": stored["credits"]})
+    return {
+        "users": len(users),
+        "credits_charged": sum(user["credits_used"] for user in users),
+        "unverifiable_users": sum(1 for user in users if user["unknown"]),
+        "mismatches": mismatches,
+        "ok": not mismatches
+    }
+
+async def main(args) -> dict:
+    import httpx
+    from db import connect_to_mongo, close_mongo_connection
+
+    resumes = load_resumes(args.responses)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.base_url:
+        await connect_to_mongo()
+        try:
+            async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+                users = await setup_users(client, args.users, args.credits, args.password)
+                report = await run_load(client, users, resumes, args)
+            report["credit_audit"] = await audit_credits(users, args.credits)
+        finally:
+            await close_mongo_connection()
+        return report
+
+    from main import app, lifespan
+    from utils.llmClient import get_llm_stats
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            users = await setup_users(client, args.users, args.credits, args.password)
+            report = await run_load(client, users, resumes, args)
+        report["credit_audit"] = await audit_credits(users, args.credits)
+        llmStats = get_llm_stats()
+        report["llm"] = {key: llmStats[key] for key in ("provider", "total_calls", "max_queue_depth", "avg_wait_ms", "usage")}
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=10, help="target arrival rate (requests per second)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to keep sending")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--credits", type=int, default=1000, help="starting balance per user")
+    parser.add_argument("--unique-ratio", type=float, default=1.0, help="fraction of requests that bypass the analysis cache")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times instead of a fixed rate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app "
+                        "(start it with RATE_LIMIT_ENABLED=false so admission control does not reject the load, "
+                        "and INCREMENTAL_ANALYSIS_ENABLED=false to measure full analyses)")
+    parser.add_argument("--responses", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded_responses.json"))
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # Must be set before the app's config module is imported
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    os.environ.setdefault("MONGO_DB_NAME", "resumegenie_loadtest")
+    # Unique requests differ only by a comment; incremental re-analysis would answer them without the LLM
+    os.environ.setdefault("INCREMENTAL_ANALYSIS_ENABLED", "false")
+    # A few simulated users send far more than the per-user rate limits allow
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    report = asyncio.run(main(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
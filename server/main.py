@@ -1,10 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import FRONTEND_URL
+from config import FRONTEND_URL, METRICS_ENABLED
 from routes import router
+from db import connect_to_mongo, close_mongo_connection, ensure_indexes
+from utils.llmClient import init_llm_client, close_llm_client
+from utils.jobQueue import start_job_workers, stop_job_workers
+from utils.creditHelper import start_reservation_sweeper, stop_reservation_sweeper
+from utils.uploadHelper import stop_extraction_pool
+from utils.metrics import MetricsMiddleware, render_metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail fast if Mongo is unreachable instead of on the first user request
+    await connect_to_mongo()
+    await ensure_indexes()
+    # Shared async LLM client so keep-alive connections are reused across requests
+    init_llm_client()
+    start_job_workers()
+    start_reservation_sweeper()
+    yield
+    await stop_reservation_sweeper()
+    await stop_job_workers()
+    stop_extraction_pool()
+    await close_llm_client()
+    await close_mongo_connection()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -27,5 +51,14 @@ async def preflight_handler(full_path: str, response: Response):
 def health_check():
     return {"status": "ok"}
 
+if METRICS_ENABLED:
+    # Added last so it wraps CORS and times the whole request
+    app.add_middleware(MetricsMiddleware)
+
+    # Prometheus scrape endpoint (text exposition format 0.0.4)
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include your routes (in routes.py)
 app.include_router(router)
\ No newline at end of file
@@ -1,12 +1,16 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, validator, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # Incoming POST request model
 class ResumeRequest(BaseModel):
     resume_text: str
     job_description: str
 
+class BatchResumeRequest(BaseModel):
+    resume_text: str
+    job_descriptions: List[str]
+
 # Full Entry
 class ResumeEntry(ResumeRequest):
     user_email: str
@@ -15,6 +19,62 @@ class ResumeEntry(ResumeRequest):
     created_at: datetime
     tailored_resume: Optional[str]
 
+# Structured result the model submits through the analysis tool
+class AnalysisResult(BaseModel):
+    success: bool
+    score: Optional[int] = None
+    message: Optional[str] = None
+    feedback: Optional[str] = None
+    tailored_resume: Optional[str] = None
+
+    @validator("score", pre=True)
+    def clamp_score(cls, value):
+        if value is None:
+            return value
+        return max(0, min(100, int(float(value))))
+
+    @model_validator(mode="after")
+    def require_success_fields(self):
+        if self.success:
+            missing = [field for field in ("score", "feedback", "tailored_resume") if getattr(self, field) is None]
+            if missing:
+                raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+        return self
+
+# Result of re-analyzing only the changed sections of a previously analyzed resume
+class TailoredSection(BaseModel):
+    title: str
+    latex: str
+
+class IncrementalAnalysisResult(BaseModel):
+    success: bool
+    score: Optional[int] = None
+    message: Optional[str] = None
+    feedback: Optional[str] = None
+    sections: List[TailoredSection] = []
+
+    @validator("score", pre=True)
+    def clamp_score(cls, value):
+        if value is None:
+            return value
+        return max(0, min(100, int(float(value))))
+
+    @model_validator(mode="after")
+    def require_success_fields(self):
+        if self.success and (self.score is None or self.feedback is None):
+            raise ValueError("Missing required field(s): score, feedback")
+        return self
+
+# Structured requirements extracted once per job posting and shared across users
+class JobRequirements(BaseModel):
+    title: Optional[str] = None
+    seniority: Optional[str] = None
+    required_skills: List[str] = []
+    preferred_skills: List[str] = []
+    responsibilities: List[str] = []
+    qualifications: List[str] = []
+    company_context: Optional[str] = None
+
 class User(BaseModel):
     email: EmailStr
     password: str
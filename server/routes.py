@@ -9,9 +9,11 @@ from utils.dependencies import get_current_user
 from endpoints.auth_routes import router as auth_router
 from endpoints.credit_routes import router as credit_router
 from endpoints.resume_routes import router as resume_router
+from endpoints.admin_routes import router as admin_router
 
 router = APIRouter()
 
 router.include_router(auth_router)
 router.include_router(credit_router)
-router.include_router(resume_router)
\ No newline at end of file
+router.include_router(resume_router)
+router.include_router(admin_router)
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""Moves inline resume/JD/tailored bodies of existing history entries into resume_blob.
+
+Run from the server directory:
+    python -m scripts.migrate_resume_blobs [--batch-size 200] [--report-only]
+"""
+import argparse
+import asyncio
+import json
+
+from db import connect_to_mongo, close_mongo_connection
+from utils.resumeStore import migrate_inline_entries, get_storage_report
+
+async def main(batch_size: int, report_only: bool):
+    await connect_to_mongo()
+    try:
+        if report_only:
+            report = await get_storage_report()
+        else:
+            report = await migrate_inline_entries(batch_size)
+        print(json.dumps(report, indent=2))
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--report-only", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.report_only))
@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime
+
+from config import ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL_SECONDS
+from db import get_analysis_cache_collection
+from utils.lruCache import LRUCache
+from utils.resumeHelper import CLAUDE_MODEL, PROMPT_VERSION
+
+memoryCache = LRUCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL_SECONDS)
+cacheStats = {
+    "memory_hits": 0,
+    "mongo_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "errors": 0
+}
+
+def analysis_cache_key(resume_text: str, job_description: str, tier: str) -> str:
+    payload = "\x1f".join([PROMPT_VERSION, CLAUDE_MODEL, tier, resume_text, job_description])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def get_cached_analysis(key: str):
+    result = memoryCache.get(key)
+    if result is not None:
+        cacheStats["memory_hits"] += 1
+        return result
+
+    # A broken cache must never fail the analysis, so Mongo errors count as misses
+    try:
+        cacheCollection = await get_analysis_cache_collection()
+        cached = await cacheCollection.find_one({"_id": key})
+    except Exception:
+        cacheStats["errors"] += 1
+        cached = None
+
+    if cached:
+        cacheStats["mongo_hits"] += 1
+        memoryCache.set(key, cached["result"])
+        return cached["result"]
+
+    cacheStats["misses"] += 1
+    return None
+
+async def store_analysis(key: str, result: dict):
+    if not result.get("success"):
+        return
+
+    memoryCache.set(key, result)
+    try:
+        cacheCollection = await get_analysis_cache_collection()
+        await cacheCollection.update_one(
+            {"_id": key},
+            {"$set": {"result": result, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+        cacheStats["stores"] += 1
+    except Exception:
+        cacheStats["errors"] += 1
+
+def get_analysis_cache_stats() -> dict:
+    lookups = cacheStats["memory_hits"] + cacheStats["mongo_hits"] + cacheStats["misses"]
+    hits = cacheStats["memory_hits"] + cacheStats["mongo_hits"]
+    return {
+        **cacheStats,
+        "memory_entries": len(memoryCache),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+    }
@@ -0,0 +1,164 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+
+from config import JD_REQUIREMENTS_ENABLED, JD_REQUIREMENTS_MIN_CHARS
+from models import ResumeEntry, ResumeRequest, User
+from utils.analysisCache import analysis_cache_key, store_analysis
+from utils.creditHelper import commit_reservation, get_remaining_credits
+from utils.jdRequirements import EXTRACTION_FAILED, requirements_key, get_cached_requirements, ensure_requirements, format_requirements
+from utils.latexCompactor import compact_resume, restore_preamble
+from utils.metrics import Counter
+from utils.singleFlight import SingleFlight
+from utils.resumeStore import insert_resume_entries
+from utils.resumeHelper import clean_input_text, is_free_usage, validate_raw_resume_size, validate_text_limits, score_resume_with_claude, FREE_TIER_LIMITS
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-run
+backgroundTasks = set()
+
+analysisFlights = SingleFlight()
+LLM_CALLS_SAVED = Counter("llm_calls_saved_total", "Analyses served by joining an identical in-flight LLM call.", ("tier",))
+PROMPT_CHARS_SAVED = Counter("prompt_chars_saved_total", "Resume characters removed by compaction before prompting.")
+
+def spawn_background(coro):
+    task = asyncio.create_task(coro)
+    backgroundTasks.add(task)
+    task.add_done_callback(backgroundTasks.discard)
+    return task
+
+def prepare_analysis(resume_request: ResumeRequest, current_user: Optional[User]) -> dict:
+    resumeText = clean_input_text(resume_request.resume_text)
+    jobDescription = clean_input_text(resume_request.job_description)
+
+    if not resumeText or not jobDescription:
+        raise HTTPException(status_code = 400, detail = "Resume and Job Description cannot be empty")
+
+    # Limits and tiers apply to what the model is sent, not to comments and preamble
+    validate_raw_resume_size(resumeText)
+    compacted = compact_resume(resumeText)
+    promptResume = compacted["text"]
+    needsCredit = not is_free_usage(promptResume, jobDescription)
+    is_paid_user = current_user is not None
+
+    validate_text_limits(promptResume, jobDescription, is_paid_user)
+    if needsCredit and not current_user:
+        raise HTTPException(
+            status_code=401, 
+            detail={
+                "message": "Login required for content exceeding free tier limits",
+                "limits": FREE_TIER_LIMITS,
+                "current": {
+                    "resume_chars": len(promptResume),
+                    "jd_chars": len(jobDescription),
+                    "total_chars": len(promptResume) + len(jobDescription)
+                }
+            }
+        )
+
+    tier = "paid" if needsCredit else "free"
+    return {
+        "resume_text": resumeText,
+        "job_description": jobDescription,
+        "needs_credit": needsCredit,
+        "tier": tier,
+        "compacted_resume": compacted,
+        # Keyed on the original text: the preamble restored onto the cached result must match
+        "cache_key": analysis_cache_key(resumeText, jobDescription, tier)
+    }
+
+def prompt_resume(analysis: dict) -> dict:
+    """The compacted resume to send to the model; call once per LLM request so the savings metric stays honest."""
+    # Queued jobs are stored without the compacted form; compaction is cheap to redo
+    compacted = analysis.get("compacted_resume") or compact_resume(analysis["resume_text"])
+    PROMPT_CHARS_SAVED.inc(compacted["stats"]["chars_before"] - compacted["stats"]["chars_after"])
+    return compacted
+
+async def prompt_job_description(analysis: dict) -> str:
+    """The posting as sent to the model: its shared extracted requirements when known, else the raw text."""
+    jobDescription = analysis["job_description"]
+    if not JD_REQUIREMENTS_ENABLED or len(jobDescription) < JD_REQUIREMENTS_MIN_CHARS:
+        return jobDescription
+
+    key = requirements_key(jobDescription)
+    requirements = await get_cached_requirements(key)
+    if requirements is EXTRACTION_FAILED:
+        return jobDescription
+    if requirements is None:
+        # First sighting of this posting: extract for later analyses rather than delay this one
+        spawn_background(ensure_requirements(jobDescription, key))
+        return jobDescription
+    compact = format_requirements(requirements)
+    return compact if len(compact) < len(jobDescription) else jobDescription
+
+async def run_analysis(analysis: dict) -> dict:
+    """Scores a prepared analysis, joining an identical call already in flight instead of paying for another.
+
+    Only the LLM call and cache write are shared; credits and history stay with each caller.
+    """
+    async def score():
+        compacted = prompt_resume(analysis)
+        jobDescription = await prompt_job_description(analysis)
+        response = await score_resume_with_claude(compacted["text"], jobDescription, tier=analysis["tier"])
+        if response.get("success"):
+            response = {**response, "tailored_resume": restore_preamble(response.get("tailored_resume"), compacted["preamble"])}
+        await store_analysis(analysis["cache_key"], response)
+        return response
+
+    response, shared = await analysisFlights.do(analysis["cache_key"], score)
+    if shared:
+        LLM_CALLS_SAVED.inc(tier=analysis["tier"])
+    return dict(response)
+
+def get_single_flight_stats() -> dict:
+    return analysisFlights.stats()
+
+def build_resume_entry(user_email: str, resumeText: str, jobDescription: str, response: dict) -> dict:
+    return ResumeEntry(
+        user_email=user_email,
+        resume_text=resumeText,
+        job_description=jobDescription,
+        score=response["score"],
+        feedback=response["feedback"],
+        tailored_resume=response["tailored_resume"],
+        created_at=datetime.utcnow(),
+    ).dict()
+
+async def save_analysis_entry(user_email: Optional[str], resumeText: str, jobDescription: str, response: dict) -> str:
+    if not user_email:
+        return "Entry generated but not saved (user not logged in)"
+
+    await insert_resume_entries([build_resume_entry(user_email, resumeText, jobDescription, response)])
+    return "Resume saved to database"
+
+async def save_and_settle(current_user: Optional[User], reservation: Optional[dict], resumeText: str, jobDescription: str, response: dict):
+    """Saves the entry while committing the credit reservation; returns (save message, remaining credits)."""
+    userEmail = current_user.email if current_user else None
+    saving = save_analysis_entry(userEmail, resumeText, jobDescription, response)
+    if reservation is not None:
+        saveMsg, committed = await asyncio.gather(saving, commit_reservation(userEmail, reservation))
+        if committed:
+            # The reservation already returned the post-decrement balance
+            return saveMsg, reservation["balance"]
+        return saveMsg, await get_remaining_credits(userEmail)
+    if current_user is None:
+        return await saving, None
+    saveMsg, remainingCredits = await asyncio.gather(saving, get_remaining_credits(userEmail))
+    return saveMsg, remainingCredits
+
+def build_analysis_data(response: dict, remaining_credits, credits_used: int, tier: str, cached: bool, compaction: dict = None) -> dict:
+    data = {
+        "score": response["score"],
+        "feedback": response["feedback"],
+        "tailored_resume": response["tailored_resume"],
+        "remaining_credits": remaining_credits,
+        "credits_used": credits_used,
+        "tier_used": tier,
+        "cached": cached
+    }
+    if compaction is not None:
+        data["compaction"] = compaction
+    if response.get("incremental"):
+        data["incremental"] = response["incremental"]
+    return data
@@ -5,7 +5,8 @@ from jose import jwt
 from models import UserCreate, User
 from db import get_user_collection
 from config import SECRET_KEY
-from utils.password import hash_password, verify_password, ALGORITHM
+from utils.password import hash_password, verify_and_update_password, ALGORITHM
+from utils.principalCache import invalidate_principal
 
 async def addNewUser(user: UserCreate):
     try:
@@ -45,8 +46,17 @@ async def checkUser(email, password):
         
         user=User(**userData)
 
-        if not verify_password(password, user.password):
+        isValid, newHash = await verify_and_update_password(password, user.password)
+        if not isValid:
             raise HTTPException(status_code=400, detail="Invalid credentials")
+
+        # Transparently upgrade hashes made with an older bcrypt cost
+        if newHash:
+            await userCollection.update_one(
+                {"email": user.email},
+                {"$set": {"password": newHash}}
+            )
+            invalidate_principal(user.email)
         
         accessTokenExpires = timedelta(minutes=30)
         accessToken = jwt.encode(
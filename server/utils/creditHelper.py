@@ -0,0 +1,177 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+
+from config import CREDIT_RESERVATION_TTL_SECONDS, CREDIT_SWEEP_INTERVAL_SECONDS, LLM_LATENCY_BUDGET_SECONDS
+from db import get_user_collection
+from models import User
+from utils.metrics import CREDITS, CREDIT_REJECTIONS
+from utils.principalCache import invalidate_principal
+
+sweeperTask = None
+
+# Sequential LLM calls one analysis can make, each bounded by the latency budget (retries included):
+# an incremental attempt, the full analysis it falls back to, and a repair call
+LLM_CALLS_PER_ANALYSIS = 3
+
+def reservation_ttl(waves: int = 1) -> float:
+    """Seconds a reservation must outlive: the worst-case LLM time of waves back-to-back analyses plus the configured slack."""
+    return waves * LLM_CALLS_PER_ANALYSIS * LLM_LATENCY_BUDGET_SECONDS + CREDIT_RESERVATION_TTL_SECONDS
+
+def insufficient_credits(current_credits: int, amount: int) -> HTTPException:
+    CREDIT_REJECTIONS.inc()
+    return HTTPException(
+        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+        detail={
+            "message": "Insufficient credits. Please purchase more to continue.",
+            "current_credits": current_credits,
+            "required_credits": amount
+        }
+    )
+
+async def deduct_credit(current_user: User, amount: int = 1):
+    # The principal may be cached, so the balance check is the conditional update itself.
+    # A single update also takes the whole amount atomically or not at all.
+    userCollection = await get_user_collection()
+    result = await userCollection.update_one(
+        {"email": current_user.email, "credits": {"$gte":amount}},
+        {"$inc": {"credits": -amount}}
+    )
+    invalidate_principal(current_user.email)
+    if result.modified_count == 0:
+        currentCredits = await get_remaining_credits(current_user.email)
+        if currentCredits < amount:
+            raise insufficient_credits(currentCredits, amount)
+        raise HTTPException(
+            status_code=500,
+            detail = "Credit deduction failed. Please try again"
+        )
+    CREDITS.inc(amount, operation="deduct")
+
+async def refund_credit(email: str, amount: int = 1):
+    userCollection = await get_user_collection()
+    await userCollection.update_one(
+        {"email": email},
+        {"$inc": {"credits": amount}}
+    )
+    invalidate_principal(email)
+    CREDITS.inc(amount, operation="refund")
+
+async def reserve_credits(email: str, amount: int = 1, waves: int = 1) -> dict:
+    """Takes amount credits and records a reservation in one atomic update.
+
+    Returns {"id", "amount", "balance"}, where balance is the post-decrement credit count,
+    so callers do not need to read it back. The reservation must be settled with
+    commit_reservation or release_reservation; the sweeper refunds any left behind once
+    they expire. waves is how many analyses the holder runs one after another.
+    """
+    reservation = {
+        "id": uuid.uuid4().hex,
+        "amount": amount,
+        "expires_at": datetime.utcnow() + timedelta(seconds=reservation_ttl(waves))
+    }
+    userCollection = await get_user_collection()
+    updated = await userCollection.find_one_and_update(
+        {"email": email, "credits": {"$gte": amount}},
+        {"$inc": {"credits": -amount}, "$push": {"credit_reservations": reservation}},
+        projection={"credits": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    invalidate_principal(email)
+    if updated is None:
+        currentCredits = await get_remaining_credits(email)
+        if currentCredits < amount:
+            raise insufficient_credits(currentCredits, amount)
+        raise HTTPException(
+            status_code=500,
+            detail = "Credit deduction failed. Please try again"
+        )
+    CREDITS.inc(amount, operation="deduct")
+    return {"id": reservation["id"], "amount": amount, "balance": updated["credits"]}
+
+async def settle_reservation(email: str, reservation: dict, refund: int = 0) -> bool:
+    """Closes a reservation, returning refund of its credits. False if it was already settled or swept."""
+    update = {"$pull": {"credit_reservations": {"id": reservation["id"]}}}
+    if refund:
+        update["$inc"] = {"credits": refund}
+    userCollection = await get_user_collection()
+    # Matching on the reservation id makes settling idempotent and exclusive with the sweeper
+    result = await userCollection.update_one({"email": email, "credit_reservations.id": reservation["id"]}, update)
+    if refund and result.modified_count:
+        invalidate_principal(email)
+        CREDITS.inc(refund, operation="refund")
+    return bool(result.modified_count)
+
+async def commit_reservation(email: str, reservation: dict, refund: int = 0) -> bool:
+    """Keeps the reservation's credits (minus refund). False if the sweeper got there first.
+
+    A swept reservation was already refunded, so the kept credits are charged again when the
+    balance still covers them, and counted as unbilled otherwise. Either way the reservation's
+    balance is stale and the caller must read the real one.
+    """
+    if await settle_reservation(email, reservation, refund):
+        return True
+    amount = reservation["amount"] - refund
+    if amount > 0:
+        userCollection = await get_user_collection()
+        result = await userCollection.update_one(
+            {"email": email, "credits": {"$gte": amount}},
+            {"$inc": {"credits": -amount}}
+        )
+        invalidate_principal(email)
+        CREDITS.inc(amount, operation="recharge" if result.modified_count else "unbilled")
+    return False
+
+async def release_reservation(email: str, reservation: dict) -> bool:
+    return await settle_reservation(email, reservation, reservation["amount"])
+
+async def sweep_expired_reservations() -> int:
+    """Refunds reservations whose request died before settling them (crash, restart, lost task)."""
+    now = datetime.utcnow()
+    userCollection = await get_user_collection()
+    refunded = 0
+    cursor = userCollection.find(
+        {"credit_reservations.expires_at": {"$lt": now}},
+        {"email": 1, "credit_reservations": 1}
+    )
+    async for user in cursor:
+        for reservation in user["credit_reservations"]:
+            if reservation["expires_at"] >= now:
+                continue
+            result = await userCollection.update_one(
+                {"email": user["email"], "credit_reservations": {"$elemMatch": {"id": reservation["id"], "expires_at": {"$lt": now}}}},
+                {"$pull": {"credit_reservations": {"id": reservation["id"]}}, "$inc": {"credits": reservation["amount"]}}
+            )
+            if result.modified_count:
+                refunded += reservation["amount"]
+                CREDITS.inc(reservation["amount"], operation="expired_refund")
+        invalidate_principal(user["email"])
+    return refunded
+
+async def reservation_sweeper():
+    while True:
+        await asyncio.sleep(CREDIT_SWEEP_INTERVAL_SECONDS)
+        try:
+            await sweep_expired_reservations()
+        except Exception:
+            # Mongo hiccups are retried on the next sweep
+            pass
+
+def start_reservation_sweeper():
+    global sweeperTask
+    sweeperTask = asyncio.create_task(reservation_sweeper())
+
+async def stop_reservation_sweeper():
+    global sweeperTask
+    if sweeperTask is not None:
+        sweeperTask.cancel()
+        await asyncio.gather(sweeperTask, return_exceptions=True)
+        sweeperTask = None
+
+async def get_remaining_credits(email: str) -> int:
+    userCollection = await get_user_collection()
+    updated_user = await userCollection.find_one({"email": email})
+    return updated_user.get("credits", 0) if updated_user else 0
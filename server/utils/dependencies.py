@@ -1,11 +1,12 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
-from config import SECRET_KEY
+from config import SECRET_KEY, ADMIN_TOKEN
 from db import get_user_collection
 from models import User
 from utils.password import ALGORITHM
+from utils.principalCache import get_cached_token, cache_token, get_cached_principal, cache_principal
 
 oauth2Scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -15,17 +16,30 @@ async def get_current_user(token: str = Depends(oauth2Scheme)):
         detail="Could not validate credentials",
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if email is None:
+    email = get_cached_token(token)
+    if email is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email = payload.get("sub")
+            if email is None:
+                raise credentialsException
+        except JWTError:
             raise credentialsException
-    except JWTError:
-        raise credentialsException
+        cache_token(token, email, payload.get("exp", 0))
+
+    cachedUser = get_cached_principal(email)
+    if cachedUser is not None:
+        return cachedUser
     
     userCollection = await get_user_collection()
     user = await userCollection.find_one({"email": email})
     if user is None:
         raise credentialsException
     
-    return User(**user)
\ No newline at end of file
+    currentUser = User(**user)
+    cache_principal(currentUser)
+    return currentUser
+
+async def require_admin(x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin access required")
@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import uuid
+from types import SimpleNamespace
+
+import httpx
+from anthropic import InternalServerError
+from anthropic.types import Message
+
+from config import (
+    LLM_FAKE_RESPONSES_PATH,
+    LLM_FAKE_LATENCY,
+    LLM_FAKE_ERROR_RATE,
+    LLM_FAKE_SEED,
+)
+from utils.latexCompactor import estimate_tokens
+from utils.prescore import SKILLS, extract_terms
+
+STREAM_CHUNK_CHARS = 64
+
+def parse_latency_spec(spec: str):
+    """Turns "fixed:ms", "uniform:lo_ms:hi_ms" or "lognormal:median_ms:sigma" into a sampler returning seconds."""
+    kind, *args = spec.split(":")
+    values = [float(arg) for arg in args]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Invalid LLM_FAKE_LATENCY spec: {spec}")
+
+def request_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "".join(request_text(item) for item in value)
+    if isinstance(value, dict):
+        return request_text(value.get("text") or value.get("content") or "")
+    return ""
+
+def fake_requirements(posting: str) -> dict:
+    # Deterministic stand-in for extraction: the posting's known skills, most mentioned first
+    terms = extract_terms(posting)
+    skills = [term for term, _ in terms.most_common() if term in SKILLS]
+    return {
+        "title": "Software Engineer",
+        "seniority": "unspecified",
+        "required_skills": skills[:10],
+        "preferred_skills": skills[10:15],
+        "responsibilities": [term for term, _ in terms.most_common(8) if term not in SKILLS],
+        "qualifications": [],
+        "company_context": None
+    }
+
+CHANGED_SECTION = re.compile(r"<changed_section>\n<title>(.*?)</title>.*?<revised>\n(.*?)\n</revised>", re.S)
+
+def fake_sections(text: str) -> list:
+    # Incremental re-analysis: hand each revised section back as its tailored version
+    return [{"title": title, "latex": latex} for title, latex in CHANGED_SECTION.findall(text)]
+
+class FakeStream:
+    def __init__(self, provider, request: dict):
+        self.provider = provider
+        self.request = request
+        self.message = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        self.message, generationSeconds = await self.provider.simulate(self.request, streaming=True)
+        block = self.message.content[0]
+        body = json.dumps(block.input)
+        chunks = [body[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(body), STREAM_CHUNK_CHARS)]
+        # Spread the generation time over the chunks after the first-token delay
+        perChunk = generationSeconds / max(1, len(chunks))
+        for chunk in chunks:
+            await asyncio.sleep(perChunk)
+            yield SimpleNamespace(type="input_json", partial_json=chunk, snapshot=None)
+
+    async def get_final_message(self):
+        if self.message is None:
+            async for _ in self:
+                pass
+        return self.message
+
+class FakeMessages:
+    def __init__(self, provider):
+        self.provider = provider
+
+    async def create(self, **request):
+        message, _ = await self.provider.simulate(request)
+        return message
+
+    def stream(self, **request):
+        return FakeStream(self.provider, request)
+
+class FakeLLMProvider:
+    """Stand-in for AsyncAnthropic that replays recorded analyses with simulated latency, errors and usage.
+
+    Replies are chosen deterministically from a hash of the request, so the same
+    resume/JD pair always gets the same analysis; latency and errors are drawn
+    from a seeded RNG.
+    """
+
+    def __init__(self, responses: list, latency: str = "fixed:0", error_rate: float = 0.0, seed: int = 0):
+        if not responses:
+            raise ValueError("FakeLLMProvider needs at least one recorded response")
+        self.responses = responses
+        self.sample_latency = parse_latency_spec(latency)
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.messages = FakeMessages(self)
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls):
+        with open(LLM_FAKE_RESPONSES_PATH, encoding="utf-8") as f:
+            responses = json.load(f)
+        return cls(responses, LLM_FAKE_LATENCY, LLM_FAKE_ERROR_RATE, LLM_FAKE_SEED)
+
+    def pick_response(self, request: dict) -> dict:
+        digest = hashlib.sha256(request_text(request.get("messages")).encode("utf-8")).digest()
+        return self.responses[int.from_bytes(digest[:8], "big") % len(self.responses)]
+
+    def tool_input(self, request: dict, recorded: dict) -> dict:
+        tool = request["tools"][0]
+        required = tool["input_schema"].get("required")
+        if tool["name"] == "repair_fields":
+            return {field: recorded.get(field) for field in required}
+        if tool["name"] == "submit_job_requirements":
+            return fake_requirements(request_text(request.get("messages")))
+        if tool["name"] == "submit_incremental_analysis":
+            return {
+                "success": True,
+                "score": recorded.get("score"),
+                "feedback": recorded.get("feedback"),
+                "sections": fake_sections(request_text(request.get("messages")))
+            }
+        return dict(recorded)
+
+    def usage(self, request: dict, output: str) -> dict:
+        # Tool definitions and the system prompt are billed as input alongside the messages
+        prompt = json.dumps(request.get("tools") or []) + request_text(request.get("system")) + request_text(request.get("messages"))
+        return {
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(output)
+        }
+
+    async def simulate(self, request: dict, streaming: bool = False):
+        self.calls += 1
+        latency = self.sample_latency(self.rng)
+        failed = self.rng.random() < self.error_rate
+
+        # Streams spend a fifth of the latency before the first token, the rest while generating
+        firstToken = latency * 0.2 if streaming else latency
+        await asyncio.sleep(firstToken)
+
+        if failed:
+            self.errors += 1
+            response = httpx.Response(529, request=httpx.Request("POST", "https://fake-llm.local/v1/messages"))
+            raise InternalServerError("Overloaded (simulated)", response=response, body=None)
+
+        toolInput = self.tool_input(request, self.pick_response(request))
+        message = Message.model_validate({
+            "id": f"msg_fake_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": [{
+                "type": "tool_use",
+                "id": f"toolu_fake_{uuid.uuid4().hex[:20]}",
+                "name": request["tools"][0]["name"],
+                "input": toolInput
+            }],
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": self.usage(request, json.dumps(toolInput))
+        })
+        return message, latency - firstToken
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors}
+
+    async def close(self):
+        pass
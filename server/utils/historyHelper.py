@@ -0,0 +1,35 @@
+import base64
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+JD_SNIPPET_CHARS = 160
+
+# Summary rows skip the resume/JD/tailored bodies; fetch those via GET /resume/{id}.
+# Plain inclusion only: job_description exists only on legacy inline entries, which derive
+# their snippet in summarize_history_entry.
+HISTORY_SUMMARY_PROJECTION = {
+    "_id": 1,
+    "score": 1,
+    "created_at": 1,
+    "jd_snippet": 1,
+    "job_description": 1
+}
+
+def summarize_history_entry(entry: dict) -> dict:
+    jobDescription = entry.pop("job_description", None)
+    if entry.get("jd_snippet") is None:
+        entry["jd_snippet"] = (jobDescription or "")[:JD_SNIPPET_CHARS]
+    return entry
+
+def encode_history_cursor(entry: dict) -> str:
+    raw = f"{entry['created_at'].isoformat()}|{entry['_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_history_cursor(cursor: str):
+    try:
+        createdAt, lastId = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(createdAt), ObjectId(lastId)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
@@ -0,0 +1,312 @@
+import re
+import time
+
+from pydantic import ValidationError
+
+from config import INCREMENTAL_ANALYSIS_ENABLED, INCREMENTAL_MAX_CHANGED_RATIO
+from db import get_resume_collection
+from models import IncrementalAnalysisResult
+from utils.analysisHelper import prompt_job_description
+from utils.latexCompactor import (
+    BEGIN_DOCUMENT,
+    END_DOCUMENT,
+    compact_resume,
+    estimate_tokens,
+    normalize_whitespace,
+    restore_preamble,
+    skip_group,
+    strip_comments,
+)
+from utils.llmClient import get_llm_client, llm_slot, record_llm_usage
+from utils.llmResilience import call_with_resilience
+from utils.metrics import ANALYSES_IN_FLIGHT, Counter
+from utils.resumeHelper import CLAUDE_MODEL
+from utils.resumeStore import content_hash, hydrate_entry
+
+# A resubmitted resume for a job the user already analyzed usually differs in a section or two.
+# Only those sections go to the model; everything else is carried over from the previous
+# tailored resume, which cuts output tokens (the expensive, slow part) to the edited sections.
+
+SECTION = re.compile(r"\\section\*?\s*\{")
+LATEX_COMMAND = re.compile(r"\\[A-Za-z@]+\*?")
+# The text between \begin{document} and the first \section (name, contact line)
+HEADER = "header"
+
+INCREMENTAL_TOOL_NAME = "submit_incremental_analysis"
+INCREMENTAL_TOOL = {
+    "name": INCREMENTAL_TOOL_NAME,
+    "description": "Submit the updated analysis and the re-tailored sections.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "success": {"type": "boolean", "description": "false only when the revised sections cannot be analyzed"},
+            "score": {"type": "integer", "minimum": 0, "maximum": 100, "description": "Fit of the whole revised resume for the job"},
+            "message": {"type": "string", "description": "Why, when success is false"},
+            "feedback": {"type": "string", "description": "Detailed, actionable feedback on the whole revised resume"},
+            "sections": {
+                "type": "array",
+                "description": "One entry per changed or added section, nothing else",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string", "description": "Section title exactly as given"},
+                        "latex": {
+                            "type": "string",
+                            "description": "Tailored LaTeX for the section, starting at its \\section command "
+                                           "(for the header: the text before the first \\section)"
+                        }
+                    },
+                    "required": ["title", "latex"]
+                }
+            }
+        },
+        "required": ["success"]
+    }
+}
+
+# Must stay byte-identical across calls: it is the cached prefix
+INCREMENTAL_SYSTEM_PROMPT = f"""You are a professional resume analysis AI. The user revised a LaTeX resume that you already scored and tailored for a job. You will receive the job description, your previous score and feedback, the titles of the unchanged and removed sections, and for each changed or added section its previous text, its revised text and your previously tailored version.
+
+**ANALYSIS TASK:**
+1. Score the whole revised resume's fit for the job (0-100), using the previous score as the baseline for the unchanged sections
+2. Update the feedback for the revised resume
+3. Tailor each changed or added section to the job, consistent with the previously tailored sections
+
+**RESPONSE FORMAT:**
+Submit your answer by calling the {INCREMENTAL_TOOL_NAME} tool exactly once, returning sections only for the changed or added sections."""
+
+INCREMENTAL_ANALYSES = Counter("incremental_analyses_total", "Resubmitted resumes by incremental re-analysis outcome.", ("outcome",))
+
+def section_key(title: str) -> str:
+    return " ".join(LATEX_COMMAND.sub(" ", title).replace("{", " ").replace("}", " ").lower().split())
+
+def split_sections(text: str):
+    """Returns (prefix, sections, suffix): prefix runs through \\begin{document}, suffix from
+    \\end{document}, and sections is a list of (key, title, chunk) led by the header."""
+    begin = BEGIN_DOCUMENT.search(text)
+    bodyStart = begin.end() if begin else 0
+    end = text.rfind(END_DOCUMENT)
+    if end < bodyStart:
+        end = len(text)
+    body = text[bodyStart:end]
+
+    starts = [match.start() for match in SECTION.finditer(body)]
+    sections = [(HEADER, HEADER, body[:starts[0] if starts else len(body)])]
+    for index, start in enumerate(starts):
+        stop = starts[index + 1] if index + 1 < len(starts) else len(body)
+        brace = body.index("{", start)
+        title = body[brace + 1:skip_group(body, brace) - 1].strip()
+        sections.append((section_key(title), title, body[start:stop]))
+    return text[:bodyStart], sections, text[end:]
+
+def unique_keys(sections: list) -> bool:
+    keys = [key for key, _, _ in sections]
+    return len(set(keys)) == len(keys)
+
+def diff_sections(previous_resume: str, resume: str):
+    """Section-level diff of two resumes, ignoring comment and whitespace edits.
+
+    None when either side has no sections or repeats a title, since sections are matched by title.
+    """
+    _, oldSections, _ = split_sections(strip_comments(previous_resume))
+    _, newSections, _ = split_sections(strip_comments(resume))
+    if len(oldSections) < 2 or len(newSections) < 2 or not unique_keys(oldSections) or not unique_keys(newSections):
+        return None
+
+    old = {key: normalize_whitespace(chunk) for key, _, chunk in oldSections}
+    new = {key: normalize_whitespace(chunk) for key, _, chunk in newSections}
+    changed = [key for key in new if key in old and new[key] != old[key]]
+    added = [key for key in new if key not in old]
+    return {
+        "order": list(new),
+        "titles": {key: title for key, title, _ in oldSections + newSections},
+        "previous": old,
+        "current": new,
+        "changed": changed,
+        "added": added,
+        "removed": [key for key in old if key not in new],
+        "changed_chars": sum(len(new[key]) for key in changed + added),
+        "total_chars": sum(len(text) for text in new.values())
+    }
+
+def merge_sections(previous_tailored: str, diff: dict, replacements: dict) -> str:
+    """Applies re-tailored sections to the previous tailored resume, keeping its section order."""
+    prefix, sections, suffix = split_sections(previous_tailored)
+    merged = [
+        (key, replacements.get(key, chunk))
+        for key, _, chunk in sections
+        if key not in diff["removed"]
+    ]
+    # Added sections go after the section that precedes them in the revised resume
+    for key in diff["added"]:
+        position = len(merged)
+        for before in reversed(diff["order"][:diff["order"].index(key)]):
+            found = [index for index, (mergedKey, _) in enumerate(merged) if mergedKey == before]
+            if found:
+                position = found[0] + 1
+                break
+        merged.insert(position, (key, replacements[key]))
+
+    chunks = [chunk if chunk.endswith("\n") else chunk + "\n" for _, chunk in merged]
+    return prefix + "\n" + "".join(chunks).lstrip("\n") + suffix
+
+def build_incremental_request(analysis: dict, job_description: str, previous: dict, diff: dict, tailored: dict) -> dict:
+    compacted = analysis.get("compacted_resume") or compact_resume(analysis["resume_text"])
+    begin = BEGIN_DOCUMENT.search(compacted["text"])
+    macros = compacted["text"][:begin.start()].strip() if begin else ""
+    titles = diff["titles"]
+
+    parts = [
+        f"<job_description>\n{job_description}\n</job_description>",
+        f"<previous_analysis>\n<score>{round(previous['score'])}</score>\n<feedback>\n{previous['feedback']}\n</feedback>\n</previous_analysis>"
+    ]
+    if macros:
+        parts.append(f"<macros>\n{macros}\n</macros>")
+    unchanged = [titles[key] for key in diff["order"] if key not in diff["changed"] and key not in diff["added"]]
+    parts.append(f"<unchanged_sections>{', '.join(unchanged)}</unchanged_sections>")
+    if diff["removed"]:
+        parts.append(f"<removed_sections>{', '.join(titles[key] for key in diff['removed'])}</removed_sections>")
+    for key in diff["changed"] + diff["added"]:
+        section = [f"<changed_section>\n<title>{titles[key]}</title>"]
+        if key in diff["previous"]:
+            section.append(f"<previous>\n{diff['previous'][key]}\n</previous>")
+        section.append(f"<revised>\n{diff['current'][key]}\n</revised>")
+        if key in tailored:
+            section.append(f"<previously_tailored>\n{normalize_whitespace(tailored[key])}\n</previously_tailored>")
+        section.append("</changed_section>")
+        parts.append("\n".join(section))
+
+    return {
+        "model": CLAUDE_MODEL,
+        # Tailored sections come out about as long as they go in
+        "max_tokens": min(4000, 1000 + 2 * estimate_tokens("".join(diff["current"][key] for key in diff["changed"] + diff["added"]))),
+        "temperature": 0.3,
+        "tools": [INCREMENTAL_TOOL],
+        "tool_choice": {"type": "tool", "name": INCREMENTAL_TOOL_NAME},
+        "system": [{
+            "type": "text",
+            "text": INCREMENTAL_SYSTEM_PROMPT
+        }],
+        "messages": [{"role": "user", "content": "\n\n".join(parts)}]
+    }
+
+async def find_previous_analysis(user_email: str, job_description: str):
+    """The user's latest saved analysis of the same job description, hydrated, or None."""
+    resumeCollection = await get_resume_collection()
+    entry = await resumeCollection.find_one(
+        {"user_email": user_email, "job_description_ref": content_hash(job_description)},
+        {"resume_text_ref": 1, "tailored_resume_ref": 1, "score": 1, "feedback": 1},
+        sort=[("created_at", -1)]
+    )
+    if entry is None:
+        return None
+    entry = await hydrate_entry(entry)
+    if not entry.get("resume_text") or not entry.get("tailored_resume"):
+        return None
+    return entry
+
+async def request_sections(request: dict, diff: dict, tier: str):
+    """Calls the model; returns (result, replacements by section key) or None if the reply is unusable."""
+    async def attempt():
+        async with llm_slot():
+            start = time.perf_counter()
+            response = await get_llm_client().messages.create(**request)
+            record_llm_usage(response.usage, time.perf_counter() - start, model=CLAUDE_MODEL, tier=tier)
+            return response
+
+    with ANALYSES_IN_FLIGHT.track(mode="incremental", tier=tier):
+        response = await call_with_resilience(attempt)
+    try:
+        toolInput = next(block.input for block in response.content if block.type == "tool_use")
+        result = IncrementalAnalysisResult.model_validate(toolInput)
+    except (StopIteration, ValidationError):
+        return None
+    if not result.success:
+        return None
+
+    replacements = {}
+    for section in result.sections:
+        key = section_key(section.title)
+        latex = section.latex
+        if key == HEADER:
+            # The header sits after \begin{document}; drop it if the model repeated it
+            begin = BEGIN_DOCUMENT.search(latex)
+            latex = latex[begin.end():] if begin else latex
+        replacements[key] = latex.strip("\n") + "\n"
+    if any(key not in replacements for key in diff["changed"] + diff["added"]):
+        return None
+    return result, replacements
+
+def reused_previous_analysis(response: dict) -> bool:
+    """True when the response is the previous analysis returned as is, without calling the model."""
+    return bool(response.get("incremental", {}).get("unchanged"))
+
+async def run_incremental_analysis(analysis: dict, user_email: str):
+    """Re-analyzes only the sections edited since the user's last analysis of this job description.
+
+    Returns a response shaped like run_analysis's, or None when a full analysis is needed instead.
+    The result is not written to the analysis cache: it builds on this user's previous analysis.
+    """
+    if not INCREMENTAL_ANALYSIS_ENABLED or not user_email:
+        return None
+
+    # A failed lookup only costs the full analysis
+    try:
+        previous = await find_previous_analysis(user_email, analysis["job_description"])
+    except Exception:
+        INCREMENTAL_ANALYSES.inc(outcome="error")
+        return None
+    if previous is None:
+        INCREMENTAL_ANALYSES.inc(outcome="no_previous")
+        return None
+
+    diff = diff_sections(previous["resume_text"], analysis["resume_text"])
+    _, tailoredSections, _ = split_sections(previous["tailored_resume"])
+    tailored = {key: chunk for key, _, chunk in tailoredSections}
+    if diff is None or not unique_keys(tailoredSections) or any(key not in tailored for key in diff["changed"]):
+        INCREMENTAL_ANALYSES.inc(outcome="unmatched")
+        return None
+    if diff["changed_chars"] > INCREMENTAL_MAX_CHANGED_RATIO * diff["total_chars"]:
+        INCREMENTAL_ANALYSES.inc(outcome="too_many_changes")
+        return None
+
+    compacted = analysis.get("compacted_resume") or compact_resume(analysis["resume_text"])
+    incremental = {
+        "previous_entry_id": str(previous["_id"]),
+        "changed_sections": [diff["titles"][key] for key in diff["changed"]],
+        "added_sections": [diff["titles"][key] for key in diff["added"]],
+        "removed_sections": [diff["titles"][key] for key in diff["removed"]],
+        "unchanged": not diff["changed"] and not diff["added"] and not diff["removed"]
+    }
+
+    if incremental["unchanged"]:
+        # Only comments or whitespace moved: the previous analysis still stands
+        INCREMENTAL_ANALYSES.inc(outcome="unchanged")
+        return {
+            "success": True,
+            "score": round(previous["score"]),
+            "feedback": previous["feedback"],
+            "tailored_resume": restore_preamble(previous["tailored_resume"], compacted["preamble"]),
+            "incremental": incremental
+        }
+
+    request = build_incremental_request(analysis, await prompt_job_description(analysis), previous, diff, tailored)
+    try:
+        reply = await request_sections(request, diff, analysis["tier"])
+    except Exception:
+        INCREMENTAL_ANALYSES.inc(outcome="failed")
+        return None
+    if reply is None:
+        # The model answered but unusably, so the full analysis that follows is a second paid call
+        INCREMENTAL_ANALYSES.inc(outcome="unusable_reply")
+        return None
+
+    result, replacements = reply
+    INCREMENTAL_ANALYSES.inc(outcome="incremental")
+    return {
+        "success": True,
+        "score": result.score,
+        "feedback": result.feedback,
+        "tailored_resume": restore_preamble(merge_sections(previous["tailored_resume"], diff, replacements), compacted["preamble"]),
+        "incremental": incremental
+    }
@@ -0,0 +1,165 @@
+import hashlib
+import re
+import time
+from datetime import datetime
+
+from config import JD_REQUIREMENTS_CACHE_SIZE, JD_REQUIREMENTS_CACHE_TTL_SECONDS, JD_REQUIREMENTS_FAILURE_TTL_SECONDS
+from db import get_jd_requirements_collection
+from models import JobRequirements
+from utils.llmClient import get_llm_client, llm_slot, record_llm_usage
+from utils.llmResilience import call_with_resilience
+from utils.lruCache import LRUCache
+from utils.resumeHelper import REPAIR_MODEL
+from utils.singleFlight import SingleFlight
+
+# Extraction is a reading task, so the small model does it
+REQUIREMENTS_MODEL = REPAIR_MODEL
+# Bump when the tool or prompt changes so requirements extracted the old way are not reused
+REQUIREMENTS_VERSION = "v1"
+
+REQUIREMENTS_TOOL_NAME = "submit_job_requirements"
+REQUIREMENTS_TOOL = {
+    "name": REQUIREMENTS_TOOL_NAME,
+    "description": "Submit the requirements extracted from the job description.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "description": "Job title"},
+            "seniority": {"type": "string", "description": "intern, junior, mid, senior, lead or unspecified"},
+            "required_skills": {"type": "array", "items": {"type": "string"}, "description": "Must-have skills and technologies"},
+            "preferred_skills": {"type": "array", "items": {"type": "string"}, "description": "Nice-to-have skills"},
+            "responsibilities": {"type": "array", "items": {"type": "string"}, "description": "Main duties, one short phrase each"},
+            "qualifications": {"type": "array", "items": {"type": "string"}, "description": "Education, years of experience, certifications"},
+            "company_context": {"type": "string", "description": "One sentence on the company, team or product"}
+        },
+        "required": ["required_skills", "responsibilities"]
+    }
+}
+
+REQUIREMENTS_PROMPT = """Extract the hiring requirements from this job description. Keep every skill, technology, \
+responsibility and qualification it states; drop benefits, boilerplate and EEO text. Use short phrases."""
+
+# Cached for a short while after a failed extraction so each posting is tried at most once per window
+EXTRACTION_FAILED = object()
+
+memoryCache = LRUCache(JD_REQUIREMENTS_CACHE_SIZE, JD_REQUIREMENTS_CACHE_TTL_SECONDS)
+extractionFlights = SingleFlight()
+requirementStats = {
+    "memory_hits": 0,
+    "mongo_hits": 0,
+    "misses": 0,
+    "extractions": 0,
+    "extraction_failures": 0,
+    "failure_hits": 0,
+    "errors": 0
+}
+
+NON_WORD = re.compile(r"[^\w+#./-]+")
+
+def normalize_job_description(text: str) -> str:
+    # Case, punctuation and whitespace differences between copies of a posting do not change it
+    return " ".join(NON_WORD.sub(" ", text.lower()).split())
+
+def requirements_key(job_description: str) -> str:
+    payload = "\x1f".join([REQUIREMENTS_VERSION, REQUIREMENTS_MODEL, normalize_job_description(job_description)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def get_cached_requirements(key: str):
+    """The posting's requirements, EXTRACTION_FAILED if extraction failed recently, or None when never extracted."""
+    requirements = memoryCache.get(key)
+    if requirements is EXTRACTION_FAILED:
+        requirementStats["failure_hits"] += 1
+        return requirements
+    if requirements is not None:
+        requirementStats["memory_hits"] += 1
+        return requirements
+
+    # Same rule as the analysis cache: a broken cache only costs the raw JD, never the analysis
+    try:
+        requirementsCollection = await get_jd_requirements_collection()
+        cached = await requirementsCollection.find_one({"_id": key})
+    except Exception:
+        requirementStats["errors"] += 1
+        cached = None
+
+    if cached:
+        requirementStats["mongo_hits"] += 1
+        memoryCache.set(key, cached["requirements"])
+        return cached["requirements"]
+
+    requirementStats["misses"] += 1
+    return None
+
+async def extract_requirements(job_description: str, key: str):
+    async def attempt():
+        async with llm_slot():
+            start = time.perf_counter()
+            response = await get_llm_client().messages.create(
+                model=REQUIREMENTS_MODEL,
+                max_tokens=1500,
+                temperature=0,
+                tools=[REQUIREMENTS_TOOL],
+                tool_choice={"type": "tool", "name": REQUIREMENTS_TOOL_NAME},
+                messages=[{
+                    "role": "user",
+                    "content": f"{REQUIREMENTS_PROMPT}\n\n<job_description>\n{job_description}\n</job_description>"
+                }]
+            )
+            record_llm_usage(response.usage, time.perf_counter() - start, model=REQUIREMENTS_MODEL, tier="jd_requirements")
+            return response
+
+    try:
+        response = await call_with_resilience(attempt)
+        toolInput = next(block.input for block in response.content if block.type == "tool_use")
+        requirements = JobRequirements.model_validate(toolInput).model_dump()
+    except Exception:
+        requirementStats["extraction_failures"] += 1
+        memoryCache.set(key, EXTRACTION_FAILED, JD_REQUIREMENTS_FAILURE_TTL_SECONDS)
+        return None
+
+    requirementStats["extractions"] += 1
+    memoryCache.set(key, requirements)
+    try:
+        requirementsCollection = await get_jd_requirements_collection()
+        await requirementsCollection.update_one(
+            {"_id": key},
+            {"$set": {"requirements": requirements, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception:
+        requirementStats["errors"] += 1
+    return requirements
+
+async def ensure_requirements(job_description: str, key: str = None):
+    """Extracts and stores the posting's requirements, once even when many analyses of it start together."""
+    key = key or requirements_key(job_description)
+    requirements, _ = await extractionFlights.do(key, lambda: extract_requirements(job_description, key))
+    return requirements
+
+def format_requirements(requirements: dict) -> str:
+    """Compact plain-text form sent to the analysis model in place of the raw posting."""
+    lines = ["Requirements extracted from the job posting:"]
+    if requirements.get("title"):
+        seniority = requirements.get("seniority")
+        suffix = f" ({seniority})" if seniority and seniority != "unspecified" else ""
+        lines.append(f"Role: {requirements['title']}{suffix}")
+    if requirements.get("company_context"):
+        lines.append(f"Context: {requirements['company_context']}")
+    for field, label in (("required_skills", "Required skills"), ("preferred_skills", "Preferred skills")):
+        if requirements.get(field):
+            lines.append(f"{label}: {', '.join(requirements[field])}")
+    for field, label in (("responsibilities", "Responsibilities"), ("qualifications", "Qualifications")):
+        if requirements.get(field):
+            lines.append(f"{label}:")
+            lines.extend(f"- {item}" for item in requirements[field])
+    return "\n".join(lines)
+
+def get_jd_requirements_stats() -> dict:
+    lookups = requirementStats["memory_hits"] + requirementStats["mongo_hits"] + requirementStats["misses"]
+    hits = requirementStats["memory_hits"] + requirementStats["mongo_hits"]
+    return {
+        **requirementStats,
+        "memory_entries": len(memoryCache),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "single_flight": extractionFlights.stats()
+    }
@@ -0,0 +1,250 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from config import ANALYSIS_CACHE_CHARGE_ON_HIT, JOB_WORKERS, JOB_QUEUE_MAX_SIZE, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_SWEEP_INTERVAL_SECONDS, JOB_RESULT_TTL_SECONDS
+from db import get_job_collection
+from utils.analysisHelper import run_analysis, save_analysis_entry, build_analysis_data, spawn_background
+from utils.incrementalAnalysis import run_incremental_analysis, reused_previous_analysis
+from utils.creditHelper import refund_credit, get_remaining_credits
+from utils.metrics import Gauge
+
+# Job lifecycle: queued -> running -> completed | failed.
+# credit_state tracks the credit held for the job: none | reserved | committed | refunded.
+jobQueue = asyncio.Queue(maxsize=JOB_QUEUE_MAX_SIZE)
+workerTasks = []
+busyWorkers = 0
+
+Gauge("analysis_job_queue_depth", "Analysis jobs waiting for a worker.", collect=lambda: jobQueue.qsize())
+Gauge("analysis_job_workers_busy", "Job workers currently running an analysis.", collect=lambda: busyWorkers)
+
+def ensure_queue_capacity():
+    if jobQueue.full():
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis queue is full. Please retry shortly.",
+            headers={"Retry-After": "10"}
+        )
+
+def enqueue_job(job_id: str):
+    try:
+        jobQueue.put_nowait(job_id)
+    except asyncio.QueueFull:
+        return False
+    return True
+
+async def create_job(user_email: str, analysis: dict, charge_credit: bool, cached_result: dict = None) -> str:
+    now = datetime.utcnow()
+    job = {
+        "user_email": user_email,
+        "resume_text": analysis["resume_text"],
+        "job_description": analysis["job_description"],
+        "tier": analysis["tier"],
+        "cache_key": analysis["cache_key"],
+        "credits_used": 1 if charge_credit else 0,
+        "credit_state": "reserved" if charge_credit else "none",
+        "status": "queued",
+        "attempts": 0,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now
+    }
+
+    if cached_result is not None:
+        job.update(await complete_job_payload(job, cached_result, cached=True))
+
+    jobCollection = await get_job_collection()
+    result = await jobCollection.insert_one(job)
+    return str(result.inserted_id)
+
+async def discard_job(job_id: str):
+    jobCollection = await get_job_collection()
+    await jobCollection.delete_one({"_id": ObjectId(job_id)})
+
+async def get_job(job_id: str, user_email: str):
+    jobCollection = await get_job_collection()
+    return await jobCollection.find_one(
+        {"_id": ObjectId(job_id), "user_email": user_email},
+        {"resume_text": 0, "job_description": 0, "cache_key": 0}
+    )
+
+async def complete_job_payload(job: dict, response: dict, cached: bool = False) -> dict:
+    await save_analysis_entry(job["user_email"], job["resume_text"], job["job_description"], response)
+    remainingCredits = await get_remaining_credits(job["user_email"])
+    now = datetime.utcnow()
+    return {
+        "status": "completed",
+        "credits_used": job["credits_used"],
+        "credit_state": "committed" if job["credits_used"] else "none",
+        "result": build_analysis_data(response, remainingCredits, job["credits_used"], job["tier"], cached),
+        "updated_at": now,
+        "finished_at": now,
+        "expires_at": now + timedelta(seconds=JOB_RESULT_TTL_SECONDS)
+    }
+
+async def claim_job(job_id: str):
+    # Claim queued jobs, or running jobs whose worker died and let the lease lapse
+    now = datetime.utcnow()
+    jobCollection = await get_job_collection()
+    return await jobCollection.find_one_and_update(
+        {
+            "_id": ObjectId(job_id),
+            "$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_expires_at": {"$lt": now}}
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "started_at": now,
+                "updated_at": now,
+                "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS)
+            },
+            "$inc": {"attempts": 1}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+
+async def refund_job_credit(job: dict):
+    # Flip the credit state first so a credit is refunded at most once
+    if job["credit_state"] != "reserved":
+        return
+    jobCollection = await get_job_collection()
+    released = await jobCollection.update_one(
+        {"_id": job["_id"], "credit_state": "reserved"},
+        {"$set": {"credit_state": "refunded"}}
+    )
+    if released.modified_count:
+        await refund_credit(job["user_email"])
+
+async def fail_job(job: dict, message: str):
+    jobCollection = await get_job_collection()
+    now = datetime.utcnow()
+
+    await refund_job_credit(job)
+
+    await jobCollection.update_one(
+        {"_id": job["_id"]},
+        {"$set": {
+            "status": "failed",
+            "error": message,
+            "updated_at": now,
+            "finished_at": now,
+            "expires_at": now + timedelta(seconds=JOB_RESULT_TTL_SECONDS)
+        }}
+    )
+
+async def run_job(job_id: str):
+    job = await claim_job(job_id)
+    if not job:
+        return
+    if job["attempts"] > JOB_MAX_ATTEMPTS:
+        # Every earlier claim lost its worker; stop retrying and refund the credit
+        await fail_job(job, "Resume analysis did not finish. Please try again")
+        return
+
+    try:
+        response = await run_incremental_analysis(job, job["user_email"]) or await run_analysis(job)
+        if not response.get("success"):
+            await fail_job(job, response.get("message", "Resume analysis failed"))
+            return
+        if job["credits_used"] and not ANALYSIS_CACHE_CHARGE_ON_HIT and reused_previous_analysis(response):
+            # No model call was made, so it is billed like a cache hit
+            await refund_job_credit(job)
+            job["credits_used"] = 0
+
+        payload = await complete_job_payload(job, response)
+        jobCollection = await get_job_collection()
+        await jobCollection.update_one({"_id": job["_id"]}, {"$set": payload})
+    except Exception as e:
+        await fail_job(job, str(e))
+
+async def job_worker():
+    global busyWorkers
+
+    while True:
+        jobId = await jobQueue.get()
+        busyWorkers += 1
+        try:
+            await run_job(jobId)
+        except Exception:
+            # Leave the job for lease expiry to recover; keep the worker alive
+            pass
+        finally:
+            busyWorkers -= 1
+            jobQueue.task_done()
+
+async def resume_pending_jobs():
+    try:
+        jobCollection = await get_job_collection()
+        pendingCursor = jobCollection.find(
+            {"status": {"$in": ["queued", "running"]}},
+            {"_id": 1, "status": 1, "lease_expires_at": 1}
+        ).sort("created_at", 1)
+        async for job in pendingCursor:
+            if job["status"] == "running":
+                # Another worker may still own it; retry once its lease has lapsed
+                delay = (job["lease_expires_at"] - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    spawn_background(requeue_after(str(job["_id"]), delay + 1))
+                    continue
+            await jobQueue.put(str(job["_id"]))
+    except Exception:
+        pass
+
+async def sweep_stale_jobs() -> int:
+    """Requeues jobs whose lease lapsed or that dropped out of the in-memory queue, on any instance."""
+    now = datetime.utcnow()
+    jobCollection = await get_job_collection()
+    staleCursor = jobCollection.find(
+        {"$or": [
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+            {"status": "queued", "updated_at": {"$lt": now - timedelta(seconds=JOB_LEASE_SECONDS)}}
+        ]},
+        {"_id": 1}
+    ).sort("created_at", 1)
+    requeued = 0
+    async for job in staleCursor:
+        # Claiming is atomic, so a job queued twice still runs once
+        if not enqueue_job(str(job["_id"])):
+            break
+        requeued += 1
+    return requeued
+
+async def job_sweeper():
+    while True:
+        await asyncio.sleep(JOB_SWEEP_INTERVAL_SECONDS)
+        try:
+            await sweep_stale_jobs()
+        except Exception:
+            # Mongo hiccups are retried on the next sweep
+            pass
+
+async def requeue_after(job_id: str, delay: float):
+    await asyncio.sleep(delay)
+    await jobQueue.put(job_id)
+
+def start_job_workers():
+    for _ in range(JOB_WORKERS):
+        workerTasks.append(asyncio.create_task(job_worker()))
+    workerTasks.append(asyncio.create_task(resume_pending_jobs()))
+    workerTasks.append(asyncio.create_task(job_sweeper()))
+
+async def stop_job_workers():
+    for task in workerTasks:
+        task.cancel()
+    await asyncio.gather(*workerTasks, return_exceptions=True)
+    workerTasks.clear()
+
+def get_job_queue_stats() -> dict:
+    return {
+        "workers": JOB_WORKERS,
+        "busy_workers": busyWorkers,
+        "queue_depth": jobQueue.qsize(),
+        "max_queue_size": JOB_QUEUE_MAX_SIZE
+    }
@@ -0,0 +1,206 @@
+import re
+
+# Shrinks resumes before they reach the model. Preamble (document class, packages, layout)
+# costs tokens but never changes the analysis, so it is held back and restored on the
+# tailored resume. Macro definitions the body actually uses stay in, since the model needs
+# them to read the body.
+
+BEGIN_DOCUMENT = re.compile(r"\\begin\s*\{document\}")
+END_DOCUMENT = "\\end{document}"
+LATEX_MARKERS = re.compile(r"\\(?:documentclass|begin\s*\{|section\*?\s*\{|item\b|textbf\s*\{)")
+
+# Only spans that actually change are matched, so ordinary single spaces cost nothing
+INLINE_SPACE = re.compile(r"[ \t\r\f\v]{2,}|[\t\r\f\v]")
+LINE_EDGE_SPACE = re.compile(r" \n ?|\n ")
+BLANK_LINES = re.compile(r"\n{3,}")
+
+DEFINITION = re.compile(
+    r"\\(?:(?:re)?newcommand|providecommand|DeclareRobustCommand)\*?\s*(\{\s*)?\\(?P<command>[A-Za-z@]+)"
+    r"|\\(?:re)?newenvironment\*?\s*\{(?P<environment>[A-Za-z@*]+)\}"
+    r"|\\[gex]?def\s*\\(?P<def>[A-Za-z@]+)"
+)
+
+# Macro definitions scanned per preamble; later ones are dropped like unused ones
+MAX_DEFINITIONS = 200
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English and LaTeX
+    return max(1, len(text) // 4)
+
+def is_latex(text: str) -> bool:
+    return LATEX_MARKERS.search(text) is not None
+
+def skip_space(text: str, i: int) -> int:
+    while i < len(text) and text[i] in " \t\n":
+        i += 1
+    return i
+
+def skip_group(text: str, i: int, opening: str = "{", closing: str = "}") -> int:
+    """Returns the index just past the balanced group opening at text[i], or len(text) if unclosed."""
+    depth = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == opening:
+            depth += 1
+        elif ch == closing:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(text)
+
+def definition_end(text: str, match) -> int:
+    i = match.end()
+    if match.group("def"):
+        # \def\name#1#2{...}: parameter text runs up to the body
+        brace = text.find("{", i)
+        return skip_group(text, brace) if brace != -1 else len(text)
+
+    if match.group(1):
+        i = skip_space(text, i)
+        if i < len(text) and text[i] == "}":
+            i += 1
+    # [argument count] and [default value]
+    i = skip_space(text, i)
+    while i < len(text) and text[i] == "[":
+        i = skip_space(text, skip_group(text, i, "[", "]"))
+
+    groups = 2 if match.group("environment") else 1
+    for _ in range(groups):
+        i = skip_space(text, i)
+        if i < len(text) and text[i] == "{":
+            i = skip_group(text, i)
+        else:
+            # Unbraced single-token body, e.g. \newcommand\foo\bar
+            lineEnd = text.find("\n", i)
+            return len(text) if lineEnd == -1 else lineEnd
+    return i
+
+def find_definitions(preamble: str) -> list:
+    definitions = []
+    for match in DEFINITION.finditer(preamble):
+        if len(definitions) >= MAX_DEFINITIONS:
+            # used_definitions is quadratic in this count; a real resume defines a few dozen at most
+            break
+        end = definition_end(preamble, match)
+        if match.group("environment"):
+            pattern = re.compile(r"\\(?:begin|end)\s*\{" + re.escape(match.group("environment")) + r"\}")
+        else:
+            name = match.group("command") or match.group("def")
+            pattern = re.compile(r"\\" + re.escape(name) + r"(?![A-Za-z@])")
+        definitions.append((pattern, preamble[match.start():end]))
+    return definitions
+
+def used_definitions(preamble: str, body: str) -> list:
+    """Definitions referenced by the body, directly or through other kept definitions, in preamble order."""
+    definitions = find_definitions(preamble)
+    kept = [False] * len(definitions)
+    searchText = body
+    changed = True
+    while changed:
+        changed = False
+        for index, (pattern, source) in enumerate(definitions):
+            if not kept[index] and pattern.search(searchText):
+                kept[index] = True
+                searchText += "\n" + source
+                changed = True
+    return [source for (_, source), keep in zip(definitions, kept) if keep]
+
+def strip_comments(text: str) -> str:
+    """Drops % comments together with the line break and the next line's indentation, as TeX reads them."""
+    parts = []
+    start = 0
+    i = text.find("%")
+    while i != -1:
+        backslashes = 0
+        while i - backslashes > 0 and text[i - backslashes - 1] == "\\":
+            backslashes += 1
+        if backslashes % 2:
+            # \% is a literal percent sign
+            i = text.find("%", i + 1)
+            continue
+        parts.append(text[start:i])
+        lineEnd = text.find("\n", i)
+        if lineEnd == -1:
+            start = len(text)
+            break
+        start = lineEnd + 1
+        while start < len(text) and text[start] in " \t":
+            start += 1
+        i = text.find("%", start)
+    parts.append(text[start:])
+    return "".join(parts)
+
+def normalize_whitespace(text: str) -> str:
+    text = INLINE_SPACE.sub(" ", text)
+    text = LINE_EDGE_SPACE.sub("\n", text)
+    return BLANK_LINES.sub("\n\n", text).strip()
+
+def compact_resume(text: str) -> dict:
+    """Returns {"text": what the model sees, "preamble": held-back preamble, "stats": sizes before/after}."""
+    preamble = ""
+    body = text
+    if is_latex(text):
+        begin = BEGIN_DOCUMENT.search(text)
+        if begin:
+            preamble = text[:begin.start()]
+            body = text[begin.start():]
+        body = strip_comments(body)
+        if preamble:
+            definitions = used_definitions(strip_comments(preamble), body)
+            if definitions:
+                body = "\n".join(definitions) + "\n" + body
+    compacted = normalize_whitespace(body)
+
+    return {
+        "text": compacted,
+        "preamble": preamble,
+        "stats": {
+            "chars_before": len(text),
+            "chars_after": len(compacted),
+            "tokens_before": estimate_tokens(text),
+            "tokens_after": estimate_tokens(compacted),
+            "preamble_chars": len(preamble)
+        }
+    }
+
+def restore_preamble(tailored: str, preamble: str) -> str:
+    """Puts the original preamble back in front of a tailored body, replacing anything the model put there."""
+    if not preamble or not tailored:
+        return tailored
+    begin = BEGIN_DOCUMENT.search(tailored)
+    if begin:
+        return preamble + tailored[begin.start():]
+    body = tailored.strip()
+    if END_DOCUMENT not in body:
+        body += "\n" + END_DOCUMENT
+    return preamble + "\\begin{document}\n" + body
+
+class PreambleRestorer:
+    """Streaming restore_preamble: holds tailored_resume deltas until \\begin{document} shows up,
+    then emits the original preamble followed by everything from there on."""
+
+    def __init__(self, preamble: str):
+        self.preamble = preamble
+        self.buffer = ""
+        self.done = not preamble
+
+    def feed(self, delta: str) -> str:
+        if self.done:
+            return delta
+        self.buffer += delta
+        begin = BEGIN_DOCUMENT.search(self.buffer)
+        if not begin:
+            return ""
+        self.done = True
+        return self.preamble + self.buffer[begin.start():]
+
+    def finish(self) -> str:
+        """Whatever is still held back; only non-empty when the body never opened the document."""
+        if self.done:
+            return ""
+        self.done = True
+        return restore_preamble(self.buffer, self.preamble)
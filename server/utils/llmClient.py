@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+from utils.metrics import Gauge, LLM_REQUEST_SECONDS, LLM_FIRST_TOKEN_SECONDS, LLM_TOKENS
+from config import (
+    CLAUDE_API,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_CONNECTIONS,
+    LLM_KEEPALIVE_CONNECTIONS,
+    LLM_TIMEOUT_SECONDS,
+    LLM_PROVIDER,
+)
+
+class LLMPool:
+    """Caps concurrent upstream LLM calls and tracks how many callers are queued."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.total_calls = 0
+        self.total_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        start = time.perf_counter()
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.total_wait_seconds += time.perf_counter() - start
+        self.total_calls += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "total_calls": self.total_calls,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / self.total_calls, 2) if self.total_calls else 0.0
+        }
+
+llm_client = None
+llm_pool = LLMPool(LLM_MAX_CONCURRENCY)
+
+Gauge("llm_pool_in_flight", "LLM calls holding a pool slot.", collect=lambda: llm_pool.in_flight)
+Gauge("llm_pool_queue_depth", "Callers waiting for an LLM pool slot.", collect=lambda: llm_pool.waiting)
+
+USAGE_FIELDS = ["input_tokens", "output_tokens"]
+usageTotals = {field: 0 for field in USAGE_FIELDS}
+recentCalls = deque(maxlen=100)
+
+def create_anthropic_client():
+    httpClient = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=60
+        ),
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10)
+    )
+    # Retries are owned by utils/llmResilience, so the SDK's own retry loop is disabled
+    return AsyncAnthropic(api_key=CLAUDE_API, http_client=httpClient, max_retries=0)
+
+def create_fake_client():
+    from utils.fakeLLM import FakeLLMProvider
+    return FakeLLMProvider.from_config()
+
+# Every provider exposes the AsyncAnthropic surface the app uses: messages.create, messages.stream and close
+LLM_PROVIDERS = {
+    "anthropic": create_anthropic_client,
+    "fake": create_fake_client
+}
+
+def init_llm_client():
+    global llm_client
+
+    if llm_client is None:
+        if LLM_PROVIDER not in LLM_PROVIDERS:
+            raise RuntimeError(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}'; expected one of {sorted(LLM_PROVIDERS)}")
+        llm_client = LLM_PROVIDERS[LLM_PROVIDER]()
+    return llm_client
+
+def set_llm_client(client):
+    # Lets tests and local runs swap in a fake provider with the same messages API
+    global llm_client
+    llm_client = client
+
+def get_llm_client():
+    # Falls back to lazy creation for scripts that run without the app lifespan
+    return llm_client or init_llm_client()
+
+async def close_llm_client():
+    global llm_client
+
+    if llm_client is not None:
+        await llm_client.close()
+        llm_client = None
+
+def llm_slot():
+    return llm_pool.slot()
+
+def record_llm_usage(usage, latency_seconds: float, first_token_seconds: float = None, model: str = "", tier: str = ""):
+    call = {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+    for field in USAGE_FIELDS:
+        usageTotals[field] += call[field]
+        LLM_TOKENS.inc(call[field], model=model, tier=tier, type=field.replace("_tokens", ""))
+    LLM_REQUEST_SECONDS.observe(latency_seconds, model=model, tier=tier)
+    if first_token_seconds is not None:
+        LLM_FIRST_TOKEN_SECONDS.observe(first_token_seconds, model=model, tier=tier)
+    call["latency_ms"] = round(1000 * latency_seconds, 1)
+    call["ttft_ms"] = round(1000 * first_token_seconds, 1) if first_token_seconds is not None else None
+    call["at"] = time.time()
+    recentCalls.append(call)
+
+def get_llm_stats() -> dict:
+    return {
+        **llm_pool.stats(),
+        "usage": dict(usageTotals),
+        "provider": LLM_PROVIDER,
+        "recent_calls": list(recentCalls)
+    }
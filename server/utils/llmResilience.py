@@ -0,0 +1,294 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+from anthropic import APIConnectionError, APIStatusError
+from fastapi import HTTPException
+
+from config import (
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+    LLM_LATENCY_BUDGET_SECONDS,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_MIN_DELAY_SECONDS,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_COOLDOWN_SECONDS,
+)
+
+class CircuitOpenError(Exception):
+    pass
+
+class LatencyBudgetExceeded(Exception):
+    pass
+
+class CircuitBreaker:
+    """closed -> open after N consecutive provider failures -> half_open after a cooldown -> closed on one success."""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+
+    def retry_after(self) -> int:
+        return max(1, int(self.opened_at + self.cooldown_seconds - time.monotonic()) + 1)
+
+    def is_available(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+            self.probe_in_flight = False
+        if self.state == "open":
+            return False
+        return not (self.state == "half_open" and self.probe_in_flight)
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError when calls must fail fast; returns True if this call is the half-open probe."""
+        if not self.is_available():
+            raise CircuitOpenError("LLM provider is degraded; failing fast")
+        if self.state == "half_open":
+            # Only one probe at a time while deciding whether to close again
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        # A probe that ended without a verdict (cancelled) must not hold the slot forever
+        self.probe_in_flight = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_after_seconds": self.retry_after() if self.state == "open" else 0
+        }
+
+breaker = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS)
+recentLatencies = deque(maxlen=200)
+resilienceStats = {
+    "calls": 0,
+    "retries": 0,
+    "hedges_launched": 0,
+    "hedges_won": 0,
+    "budget_exceeded": 0,
+    "short_circuited": 0,
+    "failures": 0
+}
+
+def is_retryable(error: Exception) -> bool:
+    # Timeouts and connection resets subclass APIConnectionError; 408/409/429/5xx (incl. 529 overloaded) are transient
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+def backoff_delay(attempt: int, error: Exception) -> float:
+    retryAfter = None
+    if isinstance(error, APIStatusError):
+        try:
+            retryAfter = float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retryAfter = None
+    # Full jitter keeps retries from many workers from synchronising
+    delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * (2 ** attempt)))
+    return max(delay, retryAfter) if retryAfter is not None else delay
+
+def p95_latency():
+    if len(recentLatencies) < 20:
+        return None
+    ordered = sorted(recentLatencies)
+    return ordered[int(0.95 * (len(ordered) - 1))]
+
+def ensure_llm_available():
+    """Rejects before any credit is deducted when the breaker is open."""
+    if not breaker.is_available():
+        resilienceStats["short_circuited"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Resume analysis is temporarily unavailable. Please retry shortly.",
+            headers={"Retry-After": str(breaker.retry_after())}
+        )
+
+async def hedged(call_factory):
+    hedgeDelay = p95_latency()
+    if not LLM_HEDGE_ENABLED or hedgeDelay is None:
+        return await call_factory()
+
+    primary = asyncio.ensure_future(call_factory())
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=max(hedgeDelay, LLM_HEDGE_MIN_DELAY_SECONDS))
+        if done:
+            return primary.result()
+
+        # Primary is slower than p95: race a second request and keep whichever succeeds first
+        resilienceStats["hedges_launched"] += 1
+        hedge = asyncio.ensure_future(call_factory())
+        tasks.add(hedge)
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        resilienceStats["hedges_won"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Covers cancellation (budget timeout, disconnect) at any await above, not only the race
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def call_with_resilience(call_factory):
+    """Runs call_factory() with jittered retries, optional hedging, a latency budget and the circuit breaker."""
+    resilienceStats["calls"] += 1
+    deadline = time.monotonic() + LLM_LATENCY_BUDGET_SECONDS
+    attempt = 0
+
+    while True:
+        try:
+            probe = breaker.before_call()
+        except CircuitOpenError:
+            resilienceStats["short_circuited"] += 1
+            raise
+
+        remaining = deadline - time.monotonic()
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(hedged(call_factory), timeout=remaining)
+        except asyncio.TimeoutError:
+            # The budget includes local llm_slot queueing, so running out says nothing about provider health;
+            # provider-side timeouts still reach the breaker as retryable APIConnectionErrors
+            if probe:
+                breaker.release_probe()
+            resilienceStats["budget_exceeded"] += 1
+            resilienceStats["failures"] += 1
+            raise LatencyBudgetExceeded(f"LLM call exceeded the {LLM_LATENCY_BUDGET_SECONDS}s latency budget")
+        except Exception as e:
+            if not is_retryable(e):
+                # Client-side errors (bad request, auth) say nothing about provider health
+                if probe:
+                    breaker.release_probe()
+                resilienceStats["failures"] += 1
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(attempt, e)
+            if attempt >= LLM_MAX_RETRIES or time.monotonic() + delay >= deadline or not breaker.is_available():
+                resilienceStats["failures"] += 1
+                raise
+            attempt += 1
+            resilienceStats["retries"] += 1
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled (client disconnect, worker shutdown): no verdict on provider health
+            if probe:
+                breaker.release_probe()
+            raise
+
+        breaker.record_success()
+        recentLatencies.append(time.monotonic() - start)
+        return result
+
+async def pump_stream(stream, events: asyncio.Queue):
+    # Drives the provider stream from a single task so its context managers enter and exit in one place
+    try:
+        async for item in stream:
+            await events.put(("item", item))
+        await events.put(("done", None))
+    except Exception as e:
+        await events.put(("error", e))
+
+async def stream_with_resilience(stream_factory):
+    """Streaming variant: retries only until the first item is yielded, since a partial stream cannot be replayed.
+
+    The latency budget bounds both the wait for the first item (across retries) and the whole stream.
+    """
+    resilienceStats["calls"] += 1
+    deadline = time.monotonic() + LLM_LATENCY_BUDGET_SECONDS
+    attempt = 0
+
+    while True:
+        try:
+            probe = breaker.before_call()
+        except CircuitOpenError:
+            resilienceStats["short_circuited"] += 1
+            raise
+
+        emitted = False
+        events = asyncio.Queue(maxsize=1)
+        pump = asyncio.ensure_future(pump_stream(stream_factory(), events))
+        try:
+            while True:
+                kind, payload = await asyncio.wait_for(events.get(), timeout=deadline - time.monotonic())
+                if kind == "done":
+                    break
+                if kind == "error":
+                    raise payload
+                emitted = True
+                yield payload
+        except asyncio.TimeoutError:
+            # Same as the blocking path: local queueing counts against the budget, so no breaker verdict
+            if probe:
+                breaker.release_probe()
+            resilienceStats["budget_exceeded"] += 1
+            resilienceStats["failures"] += 1
+            stage = "before the stream finished" if emitted else "before the first event"
+            raise LatencyBudgetExceeded(f"LLM stream exceeded the {LLM_LATENCY_BUDGET_SECONDS}s latency budget {stage}")
+        except Exception as e:
+            retryable = is_retryable(e)
+            if retryable:
+                breaker.record_failure()
+            elif probe:
+                breaker.release_probe()
+            delay = backoff_delay(attempt, e)
+            if emitted or not retryable or attempt >= LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                resilienceStats["failures"] += 1
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            resilienceStats["retries"] += 1
+            continue
+        except BaseException:
+            # Cancelled, or the consumer closed the stream early
+            if probe:
+                breaker.release_probe()
+            raise
+        finally:
+            if not pump.done():
+                pump.cancel()
+
+        breaker.record_success()
+        return
+
+def get_resilience_stats() -> dict:
+    p95 = p95_latency()
+    return {
+        **resilienceStats,
+        "breaker": breaker.stats(),
+        "p95_latency_ms": round(1000 * p95, 1) if p95 is not None else None,
+        "hedging_enabled": LLM_HEDGE_ENABLED
+    }
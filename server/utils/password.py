@@ -1,15 +1,68 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the configured cost makes verify_and_update flag any hash made with another cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a small thread pool scales with cores without blocking the event loop
+passwordExecutor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+statsLock = threading.Lock()
+poolStats = {
+    "queued": 0,
+    "active": 0,
+    "completed": 0,
+    "total_ms": 0.0
+}
+
+def _timed(fn, *args):
+    with statsLock:
+        poolStats["queued"] -= 1
+        poolStats["active"] += 1
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        elapsedMs = 1000 * (time.perf_counter() - start)
+        with statsLock:
+            poolStats["total_ms"] += elapsedMs
+            poolStats["active"] -= 1
+            poolStats["completed"] += 1
+
+async def _run_in_pool(fn, *args):
+    with statsLock:
+        poolStats["queued"] += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(passwordExecutor, _timed, fn, *args)
+
 async def hash_password(password):
-    hashedPassword = pwd_context.hash(password)
+    hashedPassword = await _run_in_pool(pwd_context.hash, password)
     return hashedPassword
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_and_update_password(plain_password, hashed_password):
+    """Returns (valid, new_hash); new_hash is set when the stored hash uses an outdated cost."""
+    return await _run_in_pool(pwd_context.verify_and_update, plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
\ No newline at end of file
+def get_password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "queue_depth": poolStats["queued"],
+        "active": poolStats["active"],
+        "completed": poolStats["completed"],
+        "avg_ms": round(poolStats["total_ms"] / poolStats["completed"], 2) if poolStats["completed"] else 0.0
+    }
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from config import (
+    PDFLATEX_PATH,
+    PDF_CACHE_DIR,
+    PDF_CACHE_MAX_BYTES,
+    PDF_COMPILE_WORKERS,
+    PDF_COMPILE_TIMEOUT_SECONDS,
+    PDF_COMPILE_MEMORY_MB,
+)
+from utils.metrics import Counter, Histogram
+from utils.resumeStore import content_hash
+from utils.singleFlight import SingleFlight
+
+PDF_RENDERS = Counter("pdf_renders_total", "PDF requests by outcome.", ("outcome",))
+PDF_COMPILE_SECONDS = Histogram(
+    "pdf_compile_duration_seconds", "pdflatex wall time per compile.", (), (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+
+class PdfRenderError(Exception):
+    pass
+
+class PdfRendererUnavailable(Exception):
+    pass
+
+compileSlots = asyncio.Semaphore(PDF_COMPILE_WORKERS)
+compileFlights = SingleFlight()
+
+def cached_pdf_path(key: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+# sh sets the limits and then execs pdflatex, so they apply to it alone. preexec_fn would do
+# the same in the forked child, but is unsafe while Motor and executor threads are running.
+LIMITED_EXEC = 'ulimit -v "$1" && ulimit -t "$2" && shift 2 && exec "$@"'
+# What sh exits with when it cannot find the command to exec
+COMMAND_NOT_FOUND = 127
+
+def compile_command(workDir: str) -> list:
+    command = [
+        PDFLATEX_PATH, "-interaction=nonstopmode", "-halt-on-error", "-no-shell-escape",
+        "-output-directory", workDir, "resume.tex"
+    ]
+    if os.name != "posix":
+        # No rlimits on Windows; the timeout still applies
+        return command
+    memoryKb = PDF_COMPILE_MEMORY_MB * 1024
+    cpuSeconds = int(PDF_COMPILE_TIMEOUT_SECONDS) + 1
+    return ["/bin/sh", "-c", LIMITED_EXEC, "sh", str(memoryKb), str(cpuSeconds), *command]
+
+def evict_pdf_cache(keep: str = None):
+    """Deletes least recently served PDFs until the cache fits PDF_CACHE_MAX_BYTES, never the one at keep."""
+    entries = []
+    for entry in os.scandir(PDF_CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= PDF_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+async def compile_latex(latex: str, key: str) -> str:
+    async with compileSlots:
+        workDir = tempfile.mkdtemp(prefix="compile-", dir=PDF_CACHE_DIR)
+        try:
+            with open(os.path.join(workDir, "resume.tex"), "w", encoding="utf-8") as f:
+                f.write(latex)
+
+            # User-influenced LaTeX: no shell escape, and no reads or writes outside the work dir
+            env = {**os.environ, "openin_any": "p", "openout_any": "p"}
+            start = time.perf_counter()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *compile_command(workDir),
+                    cwd=workDir,
+                    env=env,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT
+                )
+            except FileNotFoundError:
+                raise PdfRendererUnavailable(f"{PDFLATEX_PATH} is not installed")
+
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), timeout=PDF_COMPILE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                PDF_RENDERS.inc(outcome="timeout")
+                raise PdfRenderError(f"LaTeX compilation timed out after {PDF_COMPILE_TIMEOUT_SECONDS}s")
+            finally:
+                PDF_COMPILE_SECONDS.observe(time.perf_counter() - start)
+
+            if process.returncode == COMMAND_NOT_FOUND and os.name == "posix":
+                raise PdfRendererUnavailable(f"{PDFLATEX_PATH} is not installed")
+
+            pdfPath = os.path.join(workDir, "resume.pdf")
+            if process.returncode != 0 or not os.path.exists(pdfPath):
+                PDF_RENDERS.inc(outcome="failed")
+                # The useful part of a pdflatex log is the end, where it stopped
+                logTail = output.decode("utf-8", errors="replace")[-1500:]
+                raise PdfRenderError(f"LaTeX compilation failed:\n{logTail}")
+
+            # Same filesystem as the cache, so readers never see a partial file
+            os.replace(pdfPath, cached_pdf_path(key))
+            PDF_RENDERS.inc(outcome="compiled")
+        finally:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    path = cached_pdf_path(key)
+    await asyncio.to_thread(evict_pdf_cache, path)
+    return path
+
+def open_cached_pdf(key: str):
+    """Opens the cached PDF for key, or returns None. The open file stays readable if eviction unlinks it."""
+    path = cached_pdf_path(key)
+    try:
+        pdfFile = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        # Touch on every hit so eviction drops the least recently served files first
+        os.utime(pdfFile.fileno() if os.utime in os.supports_fd else path)
+    except FileNotFoundError:
+        pass
+    PDF_RENDERS.inc(outcome="cache_hit")
+    return pdfFile
+
+async def render_pdf(latex: str, key: str = None):
+    """Returns an open cached PDF for latex, compiling it at most once per content hash."""
+    key = key or content_hash(latex)
+    pdfFile = open_cached_pdf(key)
+    if pdfFile is not None:
+        return pdfFile
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    path, _ = await compileFlights.do(key, lambda: compile_latex(latex, key))
+    # The fresh file is the most recently used, so only a burst of other compiles could evict it first
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        raise PdfRenderError("Rendered PDF was evicted before it could be served; try again")
+
+def iter_pdf(pdfFile, chunk_size: int = 64 * 1024):
+    with pdfFile:
+        while True:
+            chunk = pdfFile.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,155 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+# Deterministic keyword/skill match between a resume and a job description, scored BM25-style.
+# No corpus is available at request time, so IDF comes from a prior: known skills weigh
+# SKILL_WEIGHT, other content words 1, and filler common to every job posting is dropped.
+# Scores are relative to the posting scored against itself, so a resume repeating the
+# posting's terms as often as it does scores 100.
+
+SKILL_WEIGHT = 3.0
+# Light saturation (a second mention adds a little) and light length normalization
+BM25_K1 = 0.5
+BM25_B = 0.3
+AVERAGE_RESUME_TERMS = 350
+MAX_LISTED_TERMS = 15
+
+SKILLS = {
+    "python", "java", "javascript", "typescript", "golang", "rust", "c++", "c#", "ruby", "php", "kotlin",
+    "swift", "scala", "sql", "bash", "html", "css", "sass", "graphql", "rest", "grpc", "json", "yaml",
+    "react", "angular", "vue", "svelte", "next.js", "node.js", "express", "django", "flask", "fastapi",
+    "spring", "rails", "laravel", ".net", "asp.net", "tailwind", "redux", "webpack", "vite",
+    "mongodb", "postgresql", "mysql", "sqlite", "redis", "elasticsearch", "cassandra", "dynamodb",
+    "kafka", "rabbitmq", "celery", "spark", "hadoop", "airflow", "dbt", "snowflake", "bigquery",
+    "aws", "gcp", "azure", "docker", "kubernetes", "terraform", "ansible", "helm", "linux", "nginx",
+    "git", "github", "gitlab", "jenkins", "ci/cd", "prometheus", "grafana", "datadog", "sentry",
+    "pytest", "jest", "selenium", "cypress", "pandas", "numpy", "scipy", "pytorch", "tensorflow",
+    "keras", "scikit-learn", "opencv", "nlp", "llm", "langchain", "openai", "figma", "jira",
+    "agile", "scrum", "microservices", "serverless", "oauth", "jwt", "websocket", "tdd",
+    "machine learning", "deep learning", "data science", "data engineering", "computer vision",
+    "distributed systems", "system design", "rest api", "unit testing", "cloud computing",
+    "project management", "product management", "data analysis", "data visualization",
+}
+
+ALIASES = {
+    "js": "javascript", "ts": "typescript", "py": "python",
+    "reactjs": "react", "react.js": "react", "vuejs": "vue", "vue.js": "vue",
+    "node": "node.js", "nodejs": "node.js", "nextjs": "next.js", "expressjs": "express",
+    "postgres": "postgresql", "mongo": "mongodb", "k8s": "kubernetes", "sklearn": "scikit-learn",
+    "google cloud": "gcp", "amazon web services": "aws", "ci": "ci/cd", "cicd": "ci/cd",
+    "ml": "machine learning", "dl": "deep learning", "restful": "rest", "apis": "api",
+}
+
+STOPWORDS = set("""
+a about above across after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my no nor not now of off on once
+only or other our ours out over own per same she should so some such than that the their theirs them then
+there these they this those through to too under until up us very via was we were what when where which while
+who whom why will with within without would you your yours
+ability able apply applicant applicants benefit benefits best candidate candidates company culture day
+description equal excellent experience experienced familiarity familiar good great help hire hiring ideal including
+job join knowledge looking member new nice opportunity plus position preferred professional proficiency
+proficient qualification qualifications related required requirement requirements responsibilities
+responsibility responsible role salary skill skills strong team teams understanding use using work
+working year years well within world
+""".split())
+
+LATEX_COMMAND = re.compile(r"\\[A-Za-z@]+\*?")
+TOKEN = re.compile(r"[a-z.][a-z0-9+#./\-]*")
+# Multi-word skills (and aliases) as (first word, " phrase", words), counted on whitespace-normalized text
+PHRASES = {
+    phrase: (phrase.split()[0], " " + phrase, phrase.split())
+    for phrase in list(SKILLS) + list(ALIASES) if " " in phrase
+}
+
+@lru_cache(maxsize=65536)
+def normalize_token(token: str) -> str:
+    """Canonical term for a token, or "" when it carries no signal."""
+    # The tokenizer keeps joiners like "." inside node.js, so sentence punctuation is trimmed here
+    token = token.rstrip("./-")
+    if len(token) < 2 or token in STOPWORDS:
+        return ""
+    token = ALIASES.get(token, token)
+    if token in SKILLS or len(token) <= 3:
+        return token
+    # Cheap plural folding so "services" matches "service"
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+def extract_terms(text: str) -> Counter:
+    """Term counts for text: content words plus known multi-word skills, with aliases folded."""
+    lowered = LATEX_COMMAND.sub(" ", text).lower()
+    tokenCounts = Counter(TOKEN.findall(lowered))
+    terms = Counter()
+    # Only distinct tokens go through normalization
+    for token, count in tokenCounts.items():
+        term = normalize_token(token)
+        if term:
+            terms[term] += count
+
+    spaced = None
+    for phrase, (firstWord, needle, words) in PHRASES.items():
+        if firstWord not in tokenCounts:
+            continue
+        if spaced is None:
+            spaced = " " + " ".join(lowered.split())
+        count = spaced.count(needle)
+        if not count:
+            continue
+        terms[ALIASES.get(phrase, phrase)] += count
+        # Words inside a matched phrase are that phrase, not separate matches ("rest api" is not also "rest" and "api")
+        for word in words:
+            term = normalize_token(word)
+            if term and terms.get(term, 0) > 0:
+                terms[term] = max(0, terms[term] - count)
+                if not terms[term]:
+                    del terms[term]
+    return terms
+
+def term_weight(term: str) -> float:
+    return SKILL_WEIGHT if term in SKILLS else 1.0
+
+def bm25_saturation(counts, document_terms: int):
+    lengthNorm = 1 - BM25_B + BM25_B * document_terms / AVERAGE_RESUME_TERMS
+    return counts * (BM25_K1 + 1) / (counts + BM25_K1 * lengthNorm)
+
+def prescore(resume_text: str, job_description: str) -> dict:
+    """0-100 match score of the resume against the job description, with matched and missing terms."""
+    jdTerms = extract_terms(job_description)
+    if not jdTerms:
+        return {"score": 0, "matched_terms": [], "missing_terms": [], "skills_matched": 0, "skills_required": 0}
+    resumeTerms = extract_terms(resume_text)
+
+    terms = list(jdTerms)
+    jdCounts = np.fromiter((jdTerms[term] for term in terms), dtype=np.float64, count=len(terms))
+    resumeCounts = np.fromiter((resumeTerms.get(term, 0) for term in terms), dtype=np.float64, count=len(terms))
+    idf = np.fromiter((term_weight(term) for term in terms), dtype=np.float64, count=len(terms))
+    isSkill = idf == SKILL_WEIGHT
+
+    # Terms the posting repeats matter more; the resume side is BM25-saturated
+    queryWeights = idf * (1 + np.log(jdCounts))
+    resumeScore = queryWeights @ bm25_saturation(resumeCounts, sum(resumeTerms.values()))
+    # The posting scored as its own resume is the best achievable match
+    bestScore = queryWeights @ bm25_saturation(jdCounts, sum(jdTerms.values()))
+    score = min(1.0, float(resumeScore / bestScore))
+
+    order = np.argsort(-queryWeights, kind="stable")
+    present = resumeCounts[order] > 0
+    matched = [terms[i] for i in order[present][:MAX_LISTED_TERMS]]
+    missing = [terms[i] for i in order[~present][:MAX_LISTED_TERMS]]
+
+    return {
+        "score": int(math.floor(100 * score + 0.5)),
+        "matched_terms": matched,
+        "missing_terms": missing,
+        "skills_matched": int(np.count_nonzero(isSkill & (resumeCounts > 0))),
+        "skills_required": int(np.count_nonzero(isSkill))
+    }
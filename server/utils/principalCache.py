@@ -0,0 +1,49 @@
+import time
+
+from config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS, TOKEN_CACHE_TTL_SECONDS
+from utils.lruCache import LRUCache
+
+# token -> (email, exp): lets repeat requests skip JWT signature verification
+tokenCache = LRUCache(PRINCIPAL_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+# email -> User: short-lived, and dropped explicitly whenever credits or profile change.
+# Invalidation only reaches this process, so with several workers a cached User.credits can lag
+# another worker's update by up to PRINCIPAL_CACHE_TTL_SECONDS: balances shown to users are read
+# fresh with get_remaining_credits, and credit checks are conditional updates, never this value.
+principalCache = LRUCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+principalStats = {
+    "token_hits": 0,
+    "token_misses": 0,
+    "principal_hits": 0,
+    "principal_misses": 0,
+    "invalidations": 0
+}
+
+def get_cached_token(token: str):
+    entry = tokenCache.get(token)
+    if entry is None or entry[1] <= time.time():
+        principalStats["token_misses"] += 1
+        return None
+    principalStats["token_hits"] += 1
+    return entry[0]
+
+def cache_token(token: str, email: str, expires_at: float):
+    tokenCache.set(token, (email, expires_at))
+
+def get_cached_principal(email: str):
+    user = principalCache.get(email)
+    principalStats["principal_hits" if user is not None else "principal_misses"] += 1
+    return user
+
+def cache_principal(user):
+    principalCache.set(user.email, user)
+
+def invalidate_principal(email: str):
+    principalStats["invalidations"] += 1
+    principalCache.pop(email)
+
+def get_principal_cache_stats() -> dict:
+    return {
+        **principalStats,
+        "tokens_cached": len(tokenCache),
+        "principals_cached": len(principalCache)
+    }
@@ -0,0 +1,159 @@
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+
+from config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_MAX_KEYS,
+    ANALYSIS_MAX_CONCURRENCY,
+    TRUST_PROXY_HEADERS,
+)
+from db import get_rate_limit_collection
+from models import User
+from utils.lruCache import LRUCache
+from utils.metrics import Counter, Gauge
+from utils.resumeHelper import FREE_TIER_LIMITS, PAID_TIER_LIMITS
+
+RATE_LIMITED = Counter("rate_limited_requests_total", "Analysis requests shed with 429.", ("reason", "tier"))
+
+# Idle buckets refill completely well within this, so evicting them loses nothing
+BUCKET_IDLE_SECONDS = 3600
+
+class MemoryRateLimitBackend:
+    """Token buckets in process memory. Each worker enforces the limit on its own."""
+
+    def __init__(self, max_keys: int):
+        self.buckets = LRUCache(max_keys, BUCKET_IDLE_SECONDS)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float):
+        now = time.monotonic()
+        tokens, updatedAt = self.buckets.get(key) or (burst, now)
+        tokens = min(burst, tokens + (now - updatedAt) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets.set(key, (tokens, now))
+        return allowed, tokens
+
+class MongoRateLimitBackend:
+    """Token buckets shared by every worker, refilled and drawn in one atomic pipeline update."""
+
+    async def take(self, key: str, rate: float, burst: float, cost: float):
+        now = datetime.utcnow()
+        elapsedSeconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        collection = await get_rate_limit_collection()
+        bucket = await collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": {"$min": [
+                    burst,
+                    {"$add": [{"$ifNull": ["$tokens", burst]}, {"$multiply": [elapsedSeconds, rate]}]}
+                ]}}},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=BUCKET_IDLE_SECONDS)
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return bucket["allowed"], bucket["tokens"]
+
+RATE_LIMIT_BACKENDS = {
+    "memory": lambda: MemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS),
+    "mongo": MongoRateLimitBackend
+}
+
+if RATE_LIMIT_BACKEND not in RATE_LIMIT_BACKENDS:
+    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND '{RATE_LIMIT_BACKEND}'; expected one of {sorted(RATE_LIMIT_BACKENDS)}")
+rateLimitBackend = RATE_LIMIT_BACKENDS[RATE_LIMIT_BACKEND]()
+
+class ConcurrencyGate:
+    """Non-blocking cap on analyses in flight: excess requests are shed instead of queued."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+analysisGate = ConcurrencyGate(ANALYSIS_MAX_CONCURRENCY)
+Gauge("analysis_admitted_in_flight", "Analyses admitted past the concurrency gate.", collect=lambda: analysisGate.in_flight)
+
+def client_address(request: Request) -> str:
+    if TRUST_PROXY_HEADERS:
+        forwardedFor = request.headers.get("x-forwarded-for")
+        if forwardedFor:
+            return forwardedFor.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def too_many_requests(message: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=message,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+async def enforce_rate_limit(request: Request, current_user: Optional[User], cost: int = 1):
+    """Draws cost tokens from the caller's bucket (user when logged in, else client IP) or raises 429."""
+    if not RATE_LIMIT_ENABLED:
+        return
+    tier = "paid" if current_user else "free"
+    limits = PAID_TIER_LIMITS if current_user else FREE_TIER_LIMITS
+    rate = limits["requests_per_minute"] / 60
+    burst = limits["burst"]
+    key = f"user:{current_user.email}" if current_user else f"ip:{client_address(request)}"
+
+    # A batch larger than the burst could never pass, so it drains a full bucket instead
+    cost = min(cost, burst)
+    allowed, tokens = await rateLimitBackend.take(key, rate, burst, cost)
+    if not allowed:
+        RATE_LIMITED.inc(reason="rate", tier=tier)
+        raise too_many_requests(
+            f"Rate limit exceeded: {limits['requests_per_minute']} analyses per minute",
+            (cost - tokens) / rate
+        )
+
+async def admit_analysis(request: Request, current_user: Optional[User], cost: int = 1):
+    """Takes a concurrency slot, then rate limits. Callers must release_analysis() once the work is done."""
+    # Gate first so requests shed for capacity do not also spend the caller's tokens
+    if not analysisGate.try_acquire():
+        RATE_LIMITED.inc(reason="concurrency", tier="paid" if current_user else "free")
+        raise too_many_requests("Server is at capacity. Please retry shortly.", 1)
+    try:
+        await enforce_rate_limit(request, current_user, cost)
+    except BaseException:
+        analysisGate.release()
+        raise
+
+def release_analysis():
+    analysisGate.release()
+
+def get_admission_stats() -> dict:
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "backend": RATE_LIMIT_BACKEND,
+        "max_concurrency": analysisGate.limit,
+        "in_flight": analysisGate.in_flight,
+        "rejected_for_concurrency": analysisGate.rejected,
+        "tiers": {
+            tier: {"requests_per_minute": limits["requests_per_minute"], "burst": limits["burst"]}
+            for tier, limits in (("free", FREE_TIER_LIMITS), ("paid", PAID_TIER_LIMITS))
+        }
+    }
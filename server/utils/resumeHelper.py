@@ -1,23 +1,35 @@
-from config import CLAUDE_API
-
-from anthropic import Anthropic
 import json
 import re
+import time
 from fastapi import HTTPException
+from pydantic import ValidationError
+
+from models import AnalysisResult
+from utils.llmClient import get_llm_client, llm_slot, record_llm_usage
+from utils.metrics import ANALYSES_IN_FLIGHT
+from utils.llmResilience import call_with_resilience, stream_with_resilience
+from utils.streamParser import JsonFieldStreamParser
 
 # Character limits
 FREE_TIER_LIMITS = {
     "resume_chars": 1000,      
     "jd_chars": 1500,         
-    "total_chars": 2500        
+    "total_chars": 2500,
+    "requests_per_minute": 6,
+    "burst": 3
 }
 
 PAID_TIER_LIMITS = {
     "resume_chars": 3000,
     "jd_chars": 5000,   
-    "total_chars": 8000  
+    "total_chars": 8000,
+    "requests_per_minute": 30,
+    "burst": 10
 }
 
+# Tier limits apply to the compacted resume; this caps what is accepted (and stored) before compaction
+RAW_RESUME_MAX_CHARS = 4 * PAID_TIER_LIMITS["resume_chars"]
+
 def clean_input_text(text: str) -> str:
     cleaned = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f]", "", text)
     return cleaned.strip()
@@ -54,6 +66,19 @@ def validate_text_limits(resume_text: str, job_description: str, is_paid: bool =
             }
         )
 
+def validate_raw_resume_size(resume_text: str):
+    """Rejects oversized raw input before compaction spends CPU on its preamble and comments."""
+    if len(resume_text) > RAW_RESUME_MAX_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Text limits exceeded",
+                "errors": [f"Resume too long before compaction: {len(resume_text)}/{RAW_RESUME_MAX_CHARS} characters"],
+                "limits": {"raw_resume_chars": RAW_RESUME_MAX_CHARS},
+                "current": {"raw_resume_chars": len(resume_text)}
+            }
+        )
+
 def is_free_usage(resume_text: str, job_description: str) -> bool:
     resume_chars = len(resume_text)
     jd_chars = len(job_description)
@@ -62,104 +87,299 @@ def is_free_usage(resume_text: str, job_description: str) -> bool:
             jd_chars <= FREE_TIER_LIMITS["jd_chars"] and 
             total_chars <= FREE_TIER_LIMITS["total_chars"])
 
-# client = OpenAI(api_key=OPENAI_API)
-claude_client = Anthropic(api_key=CLAUDE_API)
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+# Bump whenever the prompt changes so cached analyses from the old prompt are not reused
+PROMPT_VERSION = "v5"
+REPAIR_MODEL = "claude-3-5-haiku-20241022"
 
-async def score_resume_with_claude(resume_text: str, job_description: str, is_paid_user: bool = False) -> dict:
-    try:
-        if is_paid_user:
-            validation_section = """
-                **VALIDATION REQUIREMENTS:**
-                Job Description must include:
-                - Job responsibilities or description
-                - Required qualifications/skills
-                - Company or role context information
-
-                Resume must include (in LaTeX format):
-                - Education section
-                - Work experience
-                - Skills section
-                - Projects or accomplishments"""
-            
-            validation_instruction = "- If validation fails, return success=false with specific message listing what's missing"
-        else: 
-            validation_section = """
-                **VALIDATION REQUIREMENTS:**
-
-                For free tier analysis, we'll work with whatever content is provided. Basic validation only:
-                - Job description should contain some job-related information
-                - Resume should contain some professional information"""
-            
-            validation_instruction = "- Work with the provided content even if some sections are missing"
-
-        prompt = f"""
-            You are a professional resume analysis AI. You will receive a job description and a LaTeX resume, then provide analysis and optimization.
-
-            {validation_section}
-            {validation_instruction}
-
-            **ANALYSIS TASK:**
-            1. {"Validate both inputs meet requirements" if is_paid_user else "Review provided content"}
-            2. Score the resume's fit for the job (0-100)
-            3. Provide specific, actionable feedback
-            4. Generate an optimized LaTeX resume tailored to the job
-
-            **RESPONSE FORMAT:**
-            Respond ONLY with valid JSON in this exact format:
-
-            ```json
-                {{
-                    "success": true/false,
-                    "score": <0-100 integer>,
-                    "message": "<error message if success=false>",
-                    "feedback": "<detailed feedback string>",
-                    "tailored_resume": "<complete LaTeX resume code>"
-                }}
-            ``` """
-        response = claude_client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=4000,
-            temperature=0.3,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-        
-        content = response.content[0].text.strip()
-        if "```json" in content:
-            start = content.find("```json") + 7
-            end = content.find("```", start)
-            content = content[start:end].strip()
-        elif "```" in content:
-            start = content.find("```") + 3
-            end = content.find("```", start)
-            content = content[start:end].strip()
-        
-        try:
-            result = json.loads(content)
-            
-            if not isinstance(result.get("success"), bool):
-                raise ValueError("Missing or invalid 'success' field")
-            
-            if result["success"]:
-                required_fields = ["score", "feedback", "tailored_resume"]
-                for field in required_fields:
-                    if field not in result:
-                        raise ValueError(f"Missing required field: {field}")
-                if not isinstance(result["score"], int) or not 0 <= result["score"] <= 100:
-                    result["score"] = max(0, min(100, int(result.get("score", 0))))
-            
-            return result
-            
-        except (json.JSONDecodeError, ValueError) as e:
-            return {
-                "success": False,
-                "message": f"Failed to parse Claude response: {str(e)}. Raw response: {content[:200]}..."
+ANALYSIS_TOOL_NAME = "submit_resume_analysis"
+# Property order matches the streamed field order: score, then feedback, then tailored_resume
+ANALYSIS_TOOL = {
+    "name": ANALYSIS_TOOL_NAME,
+    "description": "Submit the resume analysis result.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "success": {"type": "boolean", "description": "false only when the inputs fail validation"},
+            "score": {"type": "integer", "minimum": 0, "maximum": 100, "description": "Fit of the resume for the job"},
+            "message": {"type": "string", "description": "What is missing, when success is false"},
+            "feedback": {"type": "string", "description": "Detailed, actionable feedback"},
+            "tailored_resume": {
+                "type": "string",
+                "description": "Complete LaTeX resume tailored to the job. If the resume has \\begin{document} but no "
+                               "\\documentclass, its preamble is restored automatically: start at \\begin{document}"
             }
+        },
+        "required": ["success"]
+    }
+}
+
+PAID_VALIDATION_SECTION = """
+**VALIDATION REQUIREMENTS:**
+Job Description must include:
+- Job responsibilities or description
+- Required qualifications/skills
+- Company or role context information
+
+Resume must include (in LaTeX format):
+- Education section
+- Work experience
+- Skills section
+- Projects or accomplishments
+- If validation fails, return success=false with specific message listing what's missing"""
+
+FREE_VALIDATION_SECTION = """
+**VALIDATION REQUIREMENTS:**
+
+For free tier analysis, we'll work with whatever content is provided. Basic validation only:
+- Job description should contain some job-related information
+- Resume should contain some professional information
+- Work with the provided content even if some sections are missing"""
+
+RESPONSE_FORMAT_SECTION = f"""
+**RESPONSE FORMAT:**
+Submit your answer by calling the {ANALYSIS_TOOL_NAME} tool exactly once.
+Set success=false with a message only when validation fails; otherwise fill score, feedback and tailored_resume."""
+
+def build_system_prompt(is_paid_user: bool = False) -> str:
+    # Must stay byte-identical across calls: it is the cached prefix, so no per-request data here
+    return f"""You are a professional resume analysis AI. You will receive a job description (often as the requirements extracted from the posting) and a LaTeX resume, then provide analysis and optimization.
+{PAID_VALIDATION_SECTION if is_paid_user else FREE_VALIDATION_SECTION}
+
+**ANALYSIS TASK:**
+1. {"Validate both inputs meet requirements" if is_paid_user else "Review provided content"}
+2. Score the resume's fit for the job (0-100)
+3. Provide specific, actionable feedback
+4. Generate an optimized LaTeX resume tailored to the job
+{RESPONSE_FORMAT_SECTION}"""
+
+SYSTEM_PROMPTS = {
+    True: build_system_prompt(True),
+    False: build_system_prompt(False)
+}
+
+def build_analysis_request(resume_text: str, job_description: str, is_paid_user: bool = False) -> dict:
+    """Static instructions go in the system block; only the inputs vary per call."""
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 4000,
+        "temperature": 0.3,
+        "tools": [ANALYSIS_TOOL],
+        "tool_choice": {"type": "tool", "name": ANALYSIS_TOOL_NAME},
+        "system": [{
+            "type": "text",
+            "text": SYSTEM_PROMPTS[is_paid_user]
+        }],
+        "messages": [{
+            "role": "user",
+            "content": f"<job_description>\n{job_description}\n</job_description>\n\n<resume>\n{resume_text}\n</resume>"
+        }]
+    }
+
+structuredStats = {
+    "responses": 0,
+    "parse_failures": 0,
+    "local_repairs": 0,
+    "llm_repairs": 0,
+    "repair_failures": 0
+}
+
+def extract_json_text(content: str):
+    # Fallback for replies that arrive as text instead of a tool call
+    content = content.strip()
+    if "```json" in content:
+        start = content.find("```json") + 7
+        end = content.find("```", start)
+        content = content[start:end].strip()
+    elif "```" in content:
+        start = content.find("```") + 3
+        end = content.find("```", start)
+        content = content[start:end].strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return None
+
+def extract_analysis_input(message):
+    for block in message.content:
+        if block.type == "tool_use" and block.name == ANALYSIS_TOOL_NAME:
+            return block.input
+    text = "".join(block.text for block in message.content if block.type == "text")
+    return extract_json_text(text)
+
+def validate_analysis(data) -> dict:
+    return AnalysisResult.model_validate(data).model_dump()
+
+def coerce_analysis(data: dict) -> dict:
+    coerced = dict(data)
+    if not isinstance(coerced.get("success"), bool):
+        coerced["success"] = bool(coerced.get("tailored_resume")) and not coerced.get("message")
+    if isinstance(coerced.get("feedback"), list):
+        coerced["feedback"] = "\n".join(str(item) for item in coerced["feedback"])
+    return coerced
+
+def invalid_fields(error: ValidationError) -> list:
+    fields = {str(item["loc"][0]) for item in error.errors() if item["loc"]}
+    for item in error.errors():
+        if not item["loc"]:
+            # Model-level error lists the missing fields in its message
+            fields.update(field for field in ("score", "feedback", "tailored_resume") if field in item["msg"])
+    return sorted(fields)
+
+async def repair_analysis(data: dict, fields: list, resume_text: str, job_description: str) -> dict:
+    """Asks a small model for just the broken fields instead of regenerating the whole analysis."""
+    schema = ANALYSIS_TOOL["input_schema"]["properties"]
+    repairTool = {
+        "name": "repair_fields",
+        "description": "Provide corrected values for the listed fields.",
+        "input_schema": {
+            "type": "object",
+            "properties": {field: schema[field] for field in fields if field in schema},
+            "required": [field for field in fields if field in schema]
+        }
+    }
+    partial = {key: value for key, value in data.items() if key not in fields and key != "tailored_resume"}
+    async def attempt():
+        async with llm_slot():
+            start = time.perf_counter()
+            response = await get_llm_client().messages.create(**repairRequest)
+            record_llm_usage(response.usage, time.perf_counter() - start, model=REPAIR_MODEL, tier="repair")
+            return response
+
+    repairRequest = dict(
+        model=REPAIR_MODEL,
+        max_tokens=4000 if "tailored_resume" in fields else 1000,
+        temperature=0,
+        tools=[repairTool],
+        tool_choice={"type": "tool", "name": "repair_fields"},
+        messages=[{
+            "role": "user",
+            "content": (
+                f"A resume analysis is missing or has invalid values for: {', '.join(fields)}.\n"
+                f"Existing analysis fields: {json.dumps(partial)}\n\n"
+                f"<job_description>\n{job_description}\n</job_description>\n\n<resume>\n{resume_text}\n</resume>"
+            )
+        }]
+    )
+    response = await call_with_resilience(attempt)
+
+    for block in response.content:
+        if block.type == "tool_use":
+            return {**data, **block.input, "success": True}
+    return data
+
+async def finalize_analysis(message, resume_text: str, job_description: str) -> dict:
+    structuredStats["responses"] += 1
+    data = extract_analysis_input(message)
+    try:
+        return validate_analysis(data)
+    except ValidationError as e:
+        structuredStats["parse_failures"] += 1
+        error = e
+
+    if not isinstance(data, dict):
+        structuredStats["repair_failures"] += 1
+        return {
+            "success": False,
+            "message": "Failed to parse Claude response: no structured analysis returned"
+        }
+
+    data = coerce_analysis(data)
+    try:
+        result = validate_analysis(data)
+        structuredStats["local_repairs"] += 1
+        return result
+    except ValidationError as e:
+        error = e
+
+    try:
+        repaired = await repair_analysis(data, invalid_fields(error), resume_text, job_description)
+        result = validate_analysis(repaired)
+        structuredStats["llm_repairs"] += 1
+        return result
+    except Exception as e:
+        structuredStats["repair_failures"] += 1
+        return {
+            "success": False,
+            "message": f"Failed to parse Claude response: {str(e)}"
+        }
+
+def get_structured_output_stats() -> dict:
+    responses = structuredStats["responses"]
+    return {
+        **structuredStats,
+        "parse_failure_rate": round(structuredStats["parse_failures"] / responses, 4) if responses else 0.0,
+        "repair_success_rate": round(
+            (structuredStats["local_repairs"] + structuredStats["llm_repairs"]) / structuredStats["parse_failures"], 4
+        ) if structuredStats["parse_failures"] else 0.0
+    }
+
+async def score_resume_with_claude(resume_text: str, job_description: str, is_paid_user: bool = False, tier: str = None) -> dict:
+    tier = tier or ("paid" if is_paid_user else "free")
+    try:
+        request = build_analysis_request(resume_text, job_description, is_paid_user)
+
+        async def attempt():
+            async with llm_slot():
+                start = time.perf_counter()
+                response = await get_llm_client().messages.create(**request)
+                record_llm_usage(response.usage, time.perf_counter() - start, model=CLAUDE_MODEL, tier=tier)
+                return response
+
+        with ANALYSES_IN_FLIGHT.track(mode="sync", tier=tier):
+            response = await call_with_resilience(attempt)
+            return await finalize_analysis(response, resume_text, job_description)
     
     except Exception as e:
         return {
             "success": False,
             "message": f"Claude API error: {str(e)}"
         }
+
+async def stream_resume_with_claude(resume_text: str, job_description: str, is_paid_user: bool = False, tier: str = None):
+    """Yields (field, data) events while the reply streams in, then a final ("result", dict)."""
+    tier = tier or ("paid" if is_paid_user else "free")
+    ANALYSES_IN_FLIGHT.inc(mode="stream", tier=tier)
+    try:
+        request = build_analysis_request(resume_text, job_description, is_paid_user)
+
+        async def attempt():
+            async with llm_slot():
+                start = time.perf_counter()
+                firstTokenSeconds = None
+                async with get_llm_client().messages.stream(**request) as stream:
+                    async for streamEvent in stream:
+                        # Tool input arrives as partial JSON; plain text only if the model skipped the tool
+                        if streamEvent.type == "input_json":
+                            delta = streamEvent.partial_json
+                        elif streamEvent.type == "text":
+                            delta = streamEvent.text
+                        else:
+                            continue
+                        if firstTokenSeconds is None:
+                            firstTokenSeconds = time.perf_counter() - start
+                        yield ("delta", delta)
+                    finalMessage = await stream.get_final_message()
+                record_llm_usage(finalMessage.usage, time.perf_counter() - start, firstTokenSeconds, model=CLAUDE_MODEL, tier=tier)
+                yield ("final", finalMessage)
+
+        parser = JsonFieldStreamParser()
+        finalMessage = None
+        async for kind, payload in stream_with_resilience(attempt):
+            if kind == "final":
+                finalMessage = payload
+                continue
+            for event in parser.feed(payload):
+                yield event
+
+        result = await finalize_analysis(finalMessage, resume_text, job_description)
+
+    except Exception as e:
+        result = {
+            "success": False,
+            "message": f"Claude API error: {str(e)}"
+        }
+    finally:
+        ANALYSES_IN_FLIGHT.dec(mode="stream", tier=tier)
+
+    yield ("result", result)
@@ -0,0 +1,159 @@
+import hashlib
+import zlib
+from datetime import datetime
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from config import BLOB_CACHE_SIZE, BLOB_COMPRESSION_LEVEL
+from db import get_resume_collection, get_blob_collection
+from utils.historyHelper import JD_SNIPPET_CHARS
+from utils.lruCache import LRUCache
+
+# Large bodies are stored once per content hash in resume_blob; entries keep "<field>_ref" hashes
+BLOB_FIELDS = ["resume_text", "job_description", "tailored_resume"]
+
+blobCache = LRUCache(BLOB_CACHE_SIZE, 3600)
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+async def put_blobs(texts) -> dict:
+    blobs = {}
+    for text in texts:
+        if text is not None:
+            blobs.setdefault(content_hash(text), text)
+    if not blobs:
+        return {}
+
+    now = datetime.utcnow()
+    operations = []
+    for blobHash, text in blobs.items():
+        raw = text.encode("utf-8")
+        compressed = zlib.compress(raw, BLOB_COMPRESSION_LEVEL)
+        operations.append(UpdateOne(
+            {"_id": blobHash},
+            {"$setOnInsert": {
+                "data": Binary(compressed),
+                "codec": "zlib",
+                "size": len(raw),
+                "compressed_size": len(compressed),
+                "created_at": now
+            }},
+            upsert=True
+        ))
+        blobCache.set(blobHash, text)
+
+    # One unordered round trip; bodies that already exist are left untouched
+    blobCollection = await get_blob_collection()
+    await blobCollection.bulk_write(operations, ordered=False)
+    return blobs
+
+async def get_blobs(hashes) -> dict:
+    texts = {}
+    missing = []
+    for blobHash in set(hashes):
+        text = blobCache.get(blobHash)
+        if text is None:
+            missing.append(blobHash)
+        else:
+            texts[blobHash] = text
+
+    if missing:
+        blobCollection = await get_blob_collection()
+        async for blob in blobCollection.find({"_id": {"$in": missing}}, {"data": 1}):
+            text = zlib.decompress(blob["data"]).decode("utf-8")
+            blobCache.set(blob["_id"], text)
+            texts[blob["_id"]] = text
+    return texts
+
+def to_stored_entry(entry: dict) -> dict:
+    stored = {key: value for key, value in entry.items() if key not in BLOB_FIELDS}
+    bodyBytes = 0
+    for field in BLOB_FIELDS:
+        text = entry.get(field)
+        stored[f"{field}_ref"] = content_hash(text) if text is not None else None
+        bodyBytes += len(text.encode("utf-8")) if text is not None else 0
+    stored["jd_snippet"] = (entry.get("job_description") or "")[:JD_SNIPPET_CHARS]
+    stored["body_bytes"] = bodyBytes
+    return stored
+
+async def insert_resume_entries(entries: list):
+    await put_blobs(entry.get(field) for entry in entries for field in BLOB_FIELDS)
+    resumeCollection = await get_resume_collection()
+    storedEntries = [to_stored_entry(entry) for entry in entries]
+    if len(storedEntries) == 1:
+        return await resumeCollection.insert_one(storedEntries[0])
+    return await resumeCollection.insert_many(storedEntries)
+
+async def hydrate_entries(entries: list) -> list:
+    """Restores blob-backed bodies in place; legacy inline entries pass through unchanged."""
+    refs = [
+        entry[f"{field}_ref"]
+        for entry in entries
+        for field in BLOB_FIELDS
+        if entry.get(f"{field}_ref")
+    ]
+    texts = await get_blobs(refs) if refs else {}
+    for entry in entries:
+        for field in BLOB_FIELDS:
+            ref = entry.pop(f"{field}_ref", None)
+            if ref is not None:
+                entry[field] = texts.get(ref)
+        entry.pop("body_bytes", None)
+    return entries
+
+async def hydrate_entry(entry: dict) -> dict:
+    return (await hydrate_entries([entry]))[0]
+
+async def migrate_inline_entries(batch_size: int = 200) -> dict:
+    """Moves bodies of legacy inline entries into resume_blob. Safe to re-run."""
+    resumeCollection = await get_resume_collection()
+    migrated = 0
+    legacyQuery = {"resume_text": {"$exists": True}}
+
+    while True:
+        batch = await resumeCollection.find(legacyQuery).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        await put_blobs(entry.get(field) for entry in batch for field in BLOB_FIELDS)
+        operations = []
+        for entry in batch:
+            stored = to_stored_entry(entry)
+            stored.pop("_id")
+            operations.append(UpdateOne(
+                {"_id": entry["_id"]},
+                {"$set": stored, "$unset": {field: "" for field in BLOB_FIELDS}}
+            ))
+        await resumeCollection.bulk_write(operations, ordered=False)
+        migrated += len(batch)
+
+    report = await get_storage_report()
+    report["migrated_entries"] = migrated
+    return report
+
+async def get_storage_report() -> dict:
+    resumeCollection = await get_resume_collection()
+    blobCollection = await get_blob_collection()
+
+    logical = await resumeCollection.aggregate([
+        {"$match": {"body_bytes": {"$exists": True}}},
+        {"$group": {"_id": None, "entries": {"$sum": 1}, "bytes": {"$sum": "$body_bytes"}}}
+    ]).to_list(length=1)
+    physical = await blobCollection.aggregate([
+        {"$group": {"_id": None, "blobs": {"$sum": 1}, "raw": {"$sum": "$size"}, "stored": {"$sum": "$compressed_size"}}}
+    ]).to_list(length=1)
+
+    logicalBytes = logical[0]["bytes"] if logical else 0
+    storedBytes = physical[0]["stored"] if physical else 0
+    return {
+        "blob_entries": logical[0]["entries"] if logical else 0,
+        "legacy_inline_entries": await resumeCollection.count_documents({"resume_text": {"$exists": True}}),
+        "blobs": physical[0]["blobs"] if physical else 0,
+        "logical_bytes": logicalBytes,
+        "unique_bytes": physical[0]["raw"] if physical else 0,
+        "stored_bytes": storedBytes,
+        "bytes_saved": logicalBytes - storedBytes,
+        "compression_ratio": round(logicalBytes / storedBytes, 2) if storedBytes else 0.0
+    }
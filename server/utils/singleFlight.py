@@ -0,0 +1,39 @@
+import asyncio
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task.
+
+    The shared work runs in its own task, so a caller that disconnects or is
+    cancelled does not cancel the result the other callers are waiting for.
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, factory):
+        """Returns (result, shared); shared is True when another caller's call was reused."""
+        task = self.flights.get(key)
+        shared = task is not None
+        if shared:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(factory())
+            self.flights[key] = task
+            task.add_done_callback(lambda done: self._land(key, done))
+        return await asyncio.shield(task), shared
+
+    def _land(self, key, task):
+        self.flights.pop(key, None)
+        # Mark the error as retrieved in case every waiter was cancelled before it finished
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self.flights),
+            "calls": self.leaders,
+            "coalesced_calls": self.followers
+        }
@@ -0,0 +1,130 @@
+import json
+
+STREAMED_FIELDS = ["score", "feedback", "tailored_resume"]
+
+ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t"
+}
+
+class JsonFieldStreamParser:
+    """Incrementally scans a JSON object as it is generated and emits top-level fields.
+
+    String fields are emitted as decoded text deltas while they stream in; scalar
+    fields are emitted once their value is complete. Anything before the opening
+    brace (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self, fields=STREAMED_FIELDS):
+        self.fields = set(fields)
+        self.depth = 0
+        self.in_string = False
+        self.escape = None
+        self.pending_surrogate = None
+        self.string_role = None
+        self.key = None
+        self.after_colon = False
+        self.buffer = []
+        self.scalar = []
+
+    def feed(self, text: str) -> list:
+        events = []
+        for ch in text:
+            if self.in_string:
+                self._feed_string_char(ch, events)
+            else:
+                self._feed_structural_char(ch, events)
+        self._flush_delta(events)
+        return events
+
+    def _tracked_value(self) -> bool:
+        return self.string_role == "value" and self.key in self.fields
+
+    def _emit_char(self, ch: str):
+        if self.string_role == "key" or self._tracked_value():
+            self.buffer.append(ch)
+
+    def _flush_delta(self, events: list):
+        if self.in_string and self._tracked_value() and self.buffer:
+            events.append((self.key, {"delta": "".join(self.buffer)}))
+            self.buffer = []
+
+    def _feed_string_char(self, ch: str, events: list):
+        if self.escape is not None:
+            self.escape += ch
+            if self.escape[0] == "u":
+                if len(self.escape) < 5:
+                    return
+                codepoint = int(self.escape[1:], 16)
+                self.escape = None
+                if 0xD800 <= codepoint < 0xDC00:
+                    self.pending_surrogate = codepoint
+                    return
+                if 0xDC00 <= codepoint < 0xE000 and self.pending_surrogate is not None:
+                    codepoint = 0x10000 + ((self.pending_surrogate - 0xD800) << 10) + (codepoint - 0xDC00)
+                self.pending_surrogate = None
+                self._emit_char(chr(codepoint))
+                return
+            decoded = ESCAPES.get(self.escape, self.escape)
+            self.escape = None
+            self._emit_char(decoded)
+            return
+
+        if ch == "\\":
+            self.escape = ""
+        elif ch == '"':
+            self.in_string = False
+            if self.string_role == "key":
+                self.key = "".join(self.buffer)
+            elif self._tracked_value() and self.buffer:
+                events.append((self.key, {"delta": "".join(self.buffer)}))
+            self.buffer = []
+            self.string_role = None
+        else:
+            self._emit_char(ch)
+
+    def _feed_structural_char(self, ch: str, events: list):
+        if self.depth == 0 and ch != "{":
+            return
+
+        if ch == '"':
+            if self.depth == 1:
+                self.in_string = True
+                self.string_role = "value" if self.after_colon else "key"
+                self.buffer = []
+            elif self.depth > 1:
+                # Nested strings are skipped but still need their quotes tracked
+                self.in_string = True
+                self.string_role = None
+        elif ch in "{[":
+            self.depth += 1
+        elif ch in "}]":
+            if self.depth == 1:
+                self._finish_scalar(events)
+            self.depth -= 1
+        elif self.depth == 1:
+            if ch == ":":
+                self.after_colon = True
+            elif ch == ",":
+                self._finish_scalar(events)
+            elif self.after_colon:
+                self.scalar.append(ch)
+
+    def _finish_scalar(self, events: list):
+        raw = "".join(self.scalar).strip()
+        if raw and self.key in self.fields:
+            try:
+                events.append((self.key, {"value": json.loads(raw)}))
+            except json.JSONDecodeError:
+                pass
+        self.scalar = []
+        self.after_colon = False
+
+def format_sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
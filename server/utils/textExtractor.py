@@ -0,0 +1,78 @@
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Runs inside the upload process pool: keep imports light and everything picklable.
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCX_BODY = "word/document.xml"
+# document.xml is plain text-ish XML; anything far larger than the upload cap is a zip bomb
+DOCX_MAX_XML_BYTES = 50 * 1024 * 1024
+
+class ExtractionError(Exception):
+    pass
+
+def detect_file_type(head: bytes):
+    """Sniffs the format from the first bytes; the client's content type is not trusted."""
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    return None
+
+def extract_pdf_text(data: bytes, max_pages: int) -> str:
+    # Only the pool workers load PyMuPDF
+    import fitz
+
+    try:
+        document = fitz.open(stream=data, filetype="pdf")
+    except Exception as e:
+        raise ExtractionError(f"Could not open PDF: {e}")
+    with document:
+        if document.needs_pass:
+            raise ExtractionError("Password-protected PDFs are not supported")
+        if document.page_count > max_pages:
+            raise ExtractionError(f"PDF has {document.page_count} pages; the limit is {max_pages}")
+        return "\n".join(page.get_text() for page in document)
+
+def extract_docx_text(data: bytes) -> str:
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise ExtractionError("File is not a valid DOCX document")
+
+    with archive:
+        try:
+            info = archive.getinfo(DOCX_BODY)
+        except KeyError:
+            raise ExtractionError("File is not a DOCX document")
+        if info.file_size > DOCX_MAX_XML_BYTES:
+            raise ExtractionError("DOCX document is too large")
+
+        paragraphs = []
+        with archive.open(info) as body:
+            try:
+                for _, element in ET.iterparse(body):
+                    if element.tag != WORD_NAMESPACE + "p":
+                        continue
+                    parts = []
+                    for node in element.iter():
+                        if node.tag == WORD_NAMESPACE + "t":
+                            parts.append(node.text or "")
+                        elif node.tag == WORD_NAMESPACE + "tab":
+                            parts.append("\t")
+                        elif node.tag in (WORD_NAMESPACE + "br", WORD_NAMESPACE + "cr"):
+                            parts.append("\n")
+                    paragraphs.append("".join(parts))
+                    # Paragraphs are done once seen, so memory stays flat on long documents
+                    element.clear()
+            except ET.ParseError as e:
+                raise ExtractionError(f"Could not read DOCX document: {e}")
+        return "\n".join(paragraphs)
+
+def extract_text(file_type: str, data: bytes, max_pages: int) -> str:
+    if file_type == "pdf":
+        return extract_pdf_text(data, max_pages)
+    if file_type == "docx":
+        return extract_docx_text(data)
+    raise ExtractionError(f"Unsupported file type '{file_type}'")
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from config import (
+    UPLOAD_MAX_BYTES,
+    UPLOAD_SPOOL_MEMORY_BYTES,
+    UPLOAD_MAX_PAGES,
+    UPLOAD_EXTRACT_WORKERS,
+    UPLOAD_TEXT_CACHE_SIZE,
+    UPLOAD_TEXT_CACHE_TTL_SECONDS,
+)
+from utils.lruCache import LRUCache
+from utils.metrics import Counter, Histogram
+from utils.singleFlight import SingleFlight
+from utils.textExtractor import ExtractionError, detect_file_type, extract_text
+
+UPLOAD_EXTRACTIONS = Counter("upload_extractions_total", "Uploaded resume files by extraction outcome.", ("outcome",))
+UPLOAD_EXTRACT_SECONDS = Histogram(
+    "upload_extract_duration_seconds", "Text extraction time in the process pool.", ("file_type",),
+    (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+# Text form fields (job_description) are tiny next to the file; cap them separately
+UPLOAD_MAX_FIELD_BYTES = 64 * 1024
+
+textCache = LRUCache(UPLOAD_TEXT_CACHE_SIZE, UPLOAD_TEXT_CACHE_TTL_SECONDS)
+extractionFlights = SingleFlight()
+extractionPool = None
+
+def upload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File exceeds the {round(max_bytes / (1024 * 1024), 1):g} MB upload limit")
+
+class MultipartUpload:
+    """Parses a multipart body as it streams in: the file part is hashed and spooled to a
+    SpooledTemporaryFile, other parts are kept as text fields."""
+
+    def __init__(self, boundary: bytes, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.fields = {}
+        self.file = None
+        self.filename = None
+        self.size = 0
+        self.head = b""
+        self.digest = hashlib.sha256()
+        self.error = None
+
+        self.headerField = b""
+        self.headers = {}
+        self.partName = None
+        self.partIsFile = False
+        self.fieldBytes = 0
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data
+        })
+
+    def on_part_begin(self):
+        self.headers = {}
+        self.headerField = b""
+        self.partName = None
+        self.partIsFile = False
+
+    def on_header_field(self, data, start, end):
+        self.headerField += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        field = self.headerField.lower()
+        self.headers[field] = self.headers.get(field, b"") + data[start:end]
+
+    def on_header_end(self):
+        self.headerField = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        self.partName = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            self.fields[self.partName] = b""
+            return
+        if self.file is not None:
+            self.error = HTTPException(status_code=400, detail="Upload exactly one file")
+            return
+        self.partIsFile = True
+        self.filename = options[b"filename"].decode("utf-8", errors="replace")
+        self.file = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+
+    def on_part_data(self, data, start, end):
+        if self.error:
+            return
+        chunk = data[start:end]
+        if not self.partIsFile:
+            self.fieldBytes += len(chunk)
+            if self.fieldBytes > UPLOAD_MAX_FIELD_BYTES:
+                self.error = HTTPException(status_code=413, detail="Form fields are too large")
+                return
+            self.fields[self.partName] += chunk
+            return
+
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.error = upload_too_large(self.max_bytes)
+            return
+        if len(self.head) < 8:
+            self.head += chunk[:8]
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def write(self, chunk: bytes):
+        self.parser.write(chunk)
+        if self.error:
+            raise self.error
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+async def receive_upload(request: Request) -> MultipartUpload:
+    """Streams the request body into a MultipartUpload, rejecting it with 413 as soon as it passes the cap."""
+    contentType, options = parse_options_header(request.headers.get("content-type", ""))
+    if contentType != b"multipart/form-data" or b"boundary" not in options:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    # Refuse declared oversize bodies before reading a byte (the field cap covers the form overhead)
+    contentLength = request.headers.get("content-length")
+    if contentLength and contentLength.isdigit() and int(contentLength) > UPLOAD_MAX_BYTES + UPLOAD_MAX_FIELD_BYTES:
+        raise upload_too_large(UPLOAD_MAX_BYTES)
+
+    upload = MultipartUpload(options[b"boundary"], UPLOAD_MAX_BYTES)
+    try:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.parser.finalize()
+    except BaseException:
+        upload.close()
+        raise
+
+    if upload.file is None or upload.size == 0:
+        upload.close()
+        raise HTTPException(status_code=400, detail="No resume file was uploaded")
+    return upload
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global extractionPool
+    if extractionPool is None:
+        # spawn, not fork: the web process has Motor and executor threads that must not be forked
+        extractionPool = ProcessPoolExecutor(
+            max_workers=UPLOAD_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=200
+        )
+    return extractionPool
+
+def stop_extraction_pool():
+    global extractionPool
+    if extractionPool is not None:
+        extractionPool.shutdown(wait=False, cancel_futures=True)
+        extractionPool = None
+
+async def extract_in_pool(file_type: str, data: bytes) -> str:
+    global extractionPool
+    start = time.perf_counter()
+    try:
+        text = await asyncio.get_running_loop().run_in_executor(
+            get_extraction_pool(), extract_text, file_type, data, UPLOAD_MAX_PAGES
+        )
+    except BrokenProcessPool:
+        # A worker died mid-parse (malformed file crashing the parser); start a fresh pool next time
+        extractionPool = None
+        raise ExtractionError("Could not read the uploaded file")
+    UPLOAD_EXTRACT_SECONDS.observe(time.perf_counter() - start, file_type=file_type)
+    return text
+
+async def extract_upload_text(upload: MultipartUpload):
+    """Returns (text, file_type, cached) for an upload, parsing each distinct file at most once."""
+    fileType = detect_file_type(upload.head)
+    if fileType is None:
+        UPLOAD_EXTRACTIONS.inc(outcome="unsupported")
+        raise HTTPException(status_code=415, detail="Only PDF and DOCX resumes are supported")
+
+    fileHash = upload.digest.hexdigest()
+    text = textCache.get(fileHash)
+    if text is not None:
+        UPLOAD_EXTRACTIONS.inc(outcome="cache_hit")
+        return text, fileType, True
+
+    upload.file.seek(0)
+    data = upload.file.read()
+    try:
+        text, _ = await extractionFlights.do(fileHash, lambda: extract_in_pool(fileType, data))
+    except ExtractionError as e:
+        UPLOAD_EXTRACTIONS.inc(outcome="failed")
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if not text.strip():
+        UPLOAD_EXTRACTIONS.inc(outcome="empty")
+        raise HTTPException(status_code=422, detail="No text found in the file; scanned documents are not supported")
+
+    textCache.set(fileHash, text)
+    UPLOAD_EXTRACTIONS.inc(outcome="extracted")
+    return text, fileType, False